@@ -20,6 +20,7 @@ def run_tests():
     # Run pytest with coverage using pyproject.toml configuration
     cmd = [
         sys.executable, "-m", "pytest",
+        "-n", "auto", "--dist=loadfile",
         "--cov=src",
         "--cov-report=term-missing",
         "--cov-report=html:htmlcov",
@@ -47,6 +48,7 @@ def run_unit_tests():
     
     cmd = [
         sys.executable, "-m", "pytest",
+        "-n", "auto", "--dist=loadfile",
         "-m", "unit",
         "-v",
         "--tb=short"
@@ -3,17 +3,63 @@ API endpoints for the Attack Service
 Handles REST API requests for missile launches and installation management
 """
 import time
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from decimal import Decimal
+from typing import Any, Iterator, List, Optional
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from prometheus_client import Counter
 
-from .messaging import MessagingService
+from .messaging import MessagingService, INSTALLATIONS_WITHIN_LIMIT
 
 # Prometheus metrics
 LAUNCHES = Counter("missile_launches", "Total missiles launched")
 PLATFORM_CREATIONS = Counter("platform_creations", "Total platform installations created")
 PLATFORM_ARMED = Counter("platform_armed", "Total platforms armed with munitions")
+REQUEST_SHED = Counter("requests_shed", "Requests rejected because the database was busy")
+
+def _encode_default(value: Any) -> Any:
+    """orjson fallback for NUMERIC columns, which asyncpg returns as Decimal"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class RecordResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes asyncpg NUMERIC values.
+
+    Endpoints whose rows are built in Python return this via
+    records_response, so rows are serialized once by orjson instead of
+    going through jsonable_encoder first.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_default)
+
+# Lists longer than this are streamed in chunks rather than rendered into
+# one buffer; kept well under MAX_HISTORY_LIMIT so large pages take this path
+STREAM_THRESHOLD = 1000
+STREAM_CHUNK_ROWS = 500
+
+# Upper bound on the limit parameter of the history endpoints
+MAX_HISTORY_LIMIT = 10000
+
+def _iter_json_array(rows: List[Any]) -> Iterator[bytes]:
+    """Encode rows as one JSON array, STREAM_CHUNK_ROWS at a time"""
+    yield b"["
+    for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+        if start:
+            yield b","
+        # Strip the brackets orjson puts around each chunk
+        yield orjson.dumps(rows[start:start + STREAM_CHUNK_ROWS], default=_encode_default)[1:-1]
+    yield b"]"
+
+def records_response(rows: List[Any]):
+    """Response for a list endpoint, streamed when the list is very large"""
+    if len(rows) > STREAM_THRESHOLD:
+        return StreamingResponse(_iter_json_array(rows), media_type="application/json")
+    return RecordResponse(rows)
 
 # Pydantic models
 class ArmRequest(BaseModel):
@@ -40,25 +86,47 @@ class InstallationRequest(BaseModel):
 class AttackServiceAPI:
     def __init__(self, messaging_service: MessagingService):
         self.messaging = messaging_service
-        self.app = FastAPI(title="Missile Defense Attack Service", version="2.0.0")
+        self.app = FastAPI(
+            title="Missile Defense Attack Service",
+            version="2.0.0",
+            default_response_class=RecordResponse
+        )
+        # List endpoints can return large JSON arrays; small bodies are sent as-is
+        self.app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
         self._setup_routes()
     
     def _setup_routes(self):
         """Set up all API routes"""
         
+        @self.app.exception_handler(asyncio.TimeoutError)
+        async def shed_request(request, exc):
+            """Pool acquire or query timed out; ask the client to retry"""
+            REQUEST_SHED.inc()
+            return RecordResponse({"detail": "Database busy, retry later"}, status_code=503)
+        
         @self.app.get("/")
         async def root():
             return {"message": "Missile Defense Attack Service v2.0", "status": "operational"}
         
-        @self.app.get("/platforms")
+        @self.app.get("/platforms", response_model=None)
         async def get_platforms():
             """Get all available platform types"""
-            return await self.messaging.get_platforms()
+            return Response(await self.messaging.get_platforms(), media_type="application/json")
         
-        @self.app.get("/installations")
+        @self.app.get("/installations", response_model=None)
         async def get_installations():
             """Get all installations"""
-            return await self.messaging.get_installations()
+            return Response(await self.messaging.get_installations(), media_type="application/json")
+        
+        @self.app.get("/installations/nearby", response_model=None)
+        async def get_installations_nearby(
+            lat: float = Query(..., ge=-90, le=90),
+            lon: float = Query(..., ge=-180, le=180),
+            radius_m: float = Query(..., gt=0),
+            limit: int = Query(INSTALLATIONS_WITHIN_LIMIT, ge=1, le=INSTALLATIONS_WITHIN_LIMIT)
+        ):
+            """Get installations within radius_m of a point, nearest first"""
+            return records_response(await self.messaging.get_installations_within(lat, lon, radius_m, limit))
         
         @self.app.post("/installations")
         async def create_installation(request: InstallationRequest):
@@ -77,6 +145,22 @@ class AttackServiceAPI:
                 return result
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        
+        @self.app.post("/installations/batch")
+        async def create_installations(requests: List[InstallationRequest]):
+            """Create many installations in a single database round-trip"""
+            try:
+                result = await self.messaging.create_installations(
+                    [request.model_dump() for request in requests]
+                )
+                PLATFORM_CREATIONS.inc(len(result["created"]))
+                return result
+            except asyncio.TimeoutError:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
         
@@ -88,6 +172,8 @@ class AttackServiceAPI:
                 return {"message": f"Installation {callsign} deleted successfully"}
             except ValueError as e:
                 raise HTTPException(status_code=404, detail=str(e))
+            except asyncio.TimeoutError:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
         
@@ -97,6 +183,8 @@ class AttackServiceAPI:
             try:
                 result = await self.messaging.delete_all_installations()
                 return {"message": "All installations deleted successfully"}
+            except asyncio.TimeoutError:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
         
@@ -113,6 +201,8 @@ class AttackServiceAPI:
                 return result
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
+            except asyncio.TimeoutError:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
         
@@ -131,28 +221,30 @@ class AttackServiceAPI:
                 return result
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
+            except asyncio.TimeoutError:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
         
-        @self.app.get("/missiles/active")
+        @self.app.get("/missiles/active", response_model=None)
         async def get_active_missiles():
             """Get all active missiles"""
-            return await self.messaging.get_active_missiles()
+            return Response(await self.messaging.get_active_missiles(), media_type="application/json")
         
-        @self.app.get("/detections/recent")
-        async def get_recent_detections(limit: int = 50):
+        @self.app.get("/detections/recent", response_model=None)
+        async def get_recent_detections(limit: int = Query(50, ge=1, le=MAX_HISTORY_LIMIT)):
             """Get recent detection events"""
-            return await self.messaging.get_recent_detections(limit)
+            return records_response(await self.messaging.get_recent_detections(limit))
         
-        @self.app.get("/engagements/recent")
-        async def get_recent_engagements(limit: int = 50):
+        @self.app.get("/engagements/recent", response_model=None)
+        async def get_recent_engagements(limit: int = Query(50, ge=1, le=MAX_HISTORY_LIMIT)):
             """Get recent engagement events"""
-            return await self.messaging.get_recent_engagements(limit)
+            return records_response(await self.messaging.get_recent_engagements(limit))
         
-        @self.app.get("/detonations/recent")
-        async def get_recent_detonations(limit: int = 50):
+        @self.app.get("/detonations/recent", response_model=None)
+        async def get_recent_detonations(limit: int = Query(50, ge=1, le=MAX_HISTORY_LIMIT)):
             """Get recent detonation events"""
-            return await self.messaging.get_recent_detonations(limit)
+            return records_response(await self.messaging.get_recent_detonations(limit))
         
         @self.app.get("/health")
         async def health_check():
@@ -3,52 +3,146 @@ Main entry point for the Attack Service
 Coordinates API endpoints and messaging services
 """
 import os
+import queue
+import shutil
 import asyncio
-from prometheus_client import start_http_server
+import logging
+import logging.handlers
+from fastapi import FastAPI
+import prometheus_client
+from prometheus_client import multiprocess
 import uvicorn
 
 from .api import AttackServiceAPI
 from .messaging import MessagingService
 
-# Start Prometheus metrics server
-start_http_server(8000)
+logger = logging.getLogger(__name__)
 
-async def main():
-    """Main application entry point"""
-    # Get configuration from environment
+# Prometheus metrics port; started by the launching process, not on import,
+# so that Uvicorn worker processes importing this module don't rebind it
+METRICS_PORT = 8000
+
+# Workers write metric samples here when WEB_CONCURRENCY > 1 and the parent
+# process merges them on scrape
+PROMETHEUS_MULTIPROC_DIR = "/tmp/prom"
+
+# Uvicorn server settings shared by the single-process and multi-worker paths
+SERVER_OPTIONS = {
+    "host": "0.0.0.0",
+    "port": 9000,
+    "loop": "uvloop",
+    "http": "httptools",
+    "limit_concurrency": 1000,
+    "timeout_keep_alive": 30,
+    "log_level": "info",
+}
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue so stdout writes happen on a thread
+
+    The caller owns the returned listener and stops it on exit.
+    """
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+def _load_config():
+    """Read DB and NATS settings from the environment"""
     db_dsn = os.getenv("DB_DSN")
     nats_url = os.getenv("NATS_URL", "nats://nats:4222")
-    
+
     if not db_dsn:
         raise ValueError("DB_DSN environment variable is required")
-    
+    return db_dsn, nats_url
+
+def create_app() -> FastAPI:
+    """App factory used by multi-worker Uvicorn; each worker builds its own pool"""
+    db_dsn, nats_url = _load_config()
+    log_listener = configure_logging()
+    messaging_service = MessagingService(db_dsn, nats_url)
+    app = AttackServiceAPI(messaging_service).get_app()
+
+    @app.on_event("startup")
+    async def startup():
+        logger.info("Attack Service worker starting up...")
+        await messaging_service.initialize()
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        logger.info("Attack Service worker shutting down...")
+        await messaging_service.shutdown()
+        # Drop this worker's live gauges from the aggregated totals
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            multiprocess.mark_process_dead(os.getpid())
+        log_listener.stop()
+
+    return app
+
+async def main():
+    """Main application entry point"""
+    # Get configuration from environment
+    db_dsn, nats_url = _load_config()
+
+    # Start Prometheus metrics server
+    prometheus_client.start_http_server(METRICS_PORT)
+
     # Initialize messaging service
     messaging_service = MessagingService(db_dsn, nats_url)
     await messaging_service.initialize()
-    
+
     # Initialize API service
     api_service = AttackServiceAPI(messaging_service)
     app = api_service.get_app()
-    
+
     # Add startup and shutdown events
     @app.on_event("startup")
     async def startup():
-        print("Attack Service starting up...")
-    
+        logger.info("Attack Service starting up...")
+
     @app.on_event("shutdown")
     async def shutdown():
-        print("Attack Service shutting down...")
+        logger.info("Attack Service shutting down...")
         await messaging_service.shutdown()
-    
+
     # Start the FastAPI server
-    config = uvicorn.Config(
-        app=app,
-        host="0.0.0.0",
-        port=9000,
-        log_level="info"
-    )
+    config = uvicorn.Config(app=app, **SERVER_OPTIONS)
     server = uvicorn.Server(config)
     await server.serve()
 
+def run():
+    """Console entry point; WEB_CONCURRENCY > 1 runs one event loop per core"""
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    log_listener = configure_logging()
+    try:
+        if workers > 1:
+            # Must be set before the workers import prometheus_client
+            metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", PROMETHEUS_MULTIPROC_DIR)
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            os.makedirs(metrics_dir)
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            prometheus_client.start_http_server(METRICS_PORT, registry=registry)
+            uvicorn.run(
+                "attack_service.main:create_app",
+                factory=True,
+                workers=workers,
+                **SERVER_OPTIONS
+            )
+        else:
+            # uvicorn only picks the loop itself in uvicorn.run; here the
+            # server is awaited inside our own loop, so install uvloop first.
+            # Imported here because uvloop is unavailable on Windows.
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(main())
+    finally:
+        log_listener.stop()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
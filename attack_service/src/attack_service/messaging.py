@@ -2,14 +2,258 @@
 Messaging service for the Attack Service
 Handles database operations and NATS communication
 """
+import os
 import time
 import asyncio
-from typing import Optional, Dict, List, Any
+import logging
+import functools
+import threading
+from typing import Optional, Dict, List, Any, TypedDict
 import asyncpg
 import nats
 from nats.aio.client import Client as NATS
-import json
-import math
+import orjson
+import numpy as np
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics; livesum totals the pool across live Uvicorn workers
+DB_POOL_SIZE = Gauge("db_pool_size", "Open connections in the database pool", multiprocess_mode="livesum")
+DB_POOL_IDLE = Gauge("db_pool_idle", "Idle connections in the database pool", multiprocess_mode="livesum")
+SIMULATION_TICK_SECONDS = Histogram(
+    "simulation_tick_duration_seconds", "Time to advance and encode one physics tick with missiles in flight"
+)
+# 1 when the last health check found both dependencies up; livemin reports
+# 0 if any live worker is degraded
+HEALTH_STATUS = Gauge("health_status", "Whether the last health check passed", multiprocess_mode="livemin")
+POOL_METRICS_INTERVAL = 5  # seconds, matches the Prometheus scrape interval
+
+# Launch messages are queued and published off the request path
+LAUNCH_QUEUE_SIZE = 10000
+LAUNCH_BATCH_SIZE = 64
+# Publishes only buffer; the batch is written out by one flush. The larger
+# pending buffer lets a full batch be pipelined without blocking on writes.
+NATS_PENDING_SIZE = 8 * 1024 * 1024
+NATS_FLUSH_TIMEOUT = 1
+# Upper bound on ticks written out per flush when catching up after a stall
+MAX_PUBLISH_BATCH = 50
+
+# Reference-table caches are reloaded after this many seconds
+REFERENCE_CACHE_TTL = 60
+
+# A healthy health check result is reused for this long so probe storms
+# don't each take a pool connection
+HEALTH_CACHE_TTL = 1.0
+# Each probe round trip must finish within this many seconds, so a stuck
+# dependency reports an error instead of hanging the health check
+HEALTH_PROBE_TIMEOUT = 0.25
+
+# Attack missile kinematics
+SIMULATION_TICK_S = 0.1
+DETONATION_RADIUS_M = 100
+
+# Wire schemas for the NATS subjects this service publishes. Consumers in the
+# other services decode these with json.loads, so the fields are fixed here.
+class Vector3(TypedDict):
+    x: float
+    y: float
+    z: float
+
+class LaunchMessage(TypedDict):
+    """Payload published on ``simulation.launch``"""
+    type: str
+    missile_callsign: str
+    munition_nickname: str
+    launch_callsign: str
+    launch_lat: float
+    launch_lon: float
+    launch_alt: float
+    target_lat: float
+    target_lon: float
+    target_alt: float
+    timestamp: float
+
+class MissilePositionMessage(TypedDict):
+    """One missile entry in a ``missile.positions`` batch"""
+    id: str
+    callsign: str
+    position: Vector3
+    velocity: Vector3
+    timestamp: float
+    missile_type: str
+
+class MissilePositionsMessage(TypedDict):
+    """Payload published on ``missile.positions``, one per simulation tick"""
+    timestamp: float
+    missiles: List[MissilePositionMessage]
+
+# Hot-path SQL. asyncpg prepares each distinct query text once per
+# connection and reuses it from its statement cache, so every call site
+# shares one constant rather than re-spelling the string.
+#
+# List reads build their JSON array in Postgres with json_agg and come back
+# as a single text value, so no per-row Python objects are created.
+SQL_GET_PLATFORMS = """
+    SELECT COALESCE(json_agg(pt ORDER BY pt.category, pt.nickname), '[]'::json)
+    FROM platform_type pt
+"""
+
+SQL_GET_PLATFORM_IDS = "SELECT id, nickname FROM platform_type"
+
+SQL_GET_MUNITION_IDS = "SELECT id, nickname FROM munition_type"
+
+SQL_GET_INSTALLATIONS = """
+    SELECT COALESCE(json_agg(r ORDER BY r.category, r.callsign), '[]'::json)
+    FROM (
+        SELECT i.id, i.callsign,
+               i.lon_deg as lon, i.lat_deg as lat,
+               i.altitude_m,
+               i.heading_deg, i.status,
+               pt.nickname as platform_nickname, pt.category, pt.is_mobile
+        FROM installation i
+        JOIN platform_type pt ON i.platform_type_id = pt.id
+    ) r
+"""
+
+SQL_GET_ACTIVE_MISSILES = """
+    SELECT COALESCE(json_agg(r), '[]'::json)
+    FROM (
+        SELECT 
+            am.id as callsign,
+            mt.nickname as munition_type,
+            am.status,
+            ST_X(am.current_geom::geometry) as lon,
+            ST_Y(am.current_geom::geometry) as lat,
+            am.current_altitude_m,
+            am.launch_ts
+        FROM active_missile am
+        JOIN munition_type mt ON am.munition_type_id = mt.id
+        WHERE am.status = 'active'
+    ) r
+"""
+
+SQL_DELETE_INSTALLATION = "DELETE FROM installation WHERE callsign = $1 RETURNING id"
+
+# Counts in the database instead of returning a row per deleted installation
+SQL_DELETE_ALL_INSTALLATIONS = """
+    WITH deleted AS (DELETE FROM installation RETURNING 1)
+    SELECT COUNT(*) FROM deleted
+"""
+
+# Radius search backed by the GiST index on installation.geom. Filter with
+# ST_DWithin, never ST_Distance(...) < r, which cannot use the index.
+# Cap on radius search results; rows come back nearest first
+INSTALLATIONS_WITHIN_LIMIT = 500
+
+SQL_GET_INSTALLATIONS_WITHIN = """
+    SELECT i.id, i.callsign,
+           i.lon_deg as lon, i.lat_deg as lat,
+           ST_Distance(i.geom, p.geom) as distance_m
+    FROM installation i,
+         (SELECT ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography AS geom) p
+    WHERE ST_DWithin(i.geom, p.geom, $3)
+    ORDER BY distance_m
+    LIMIT $4
+"""
+
+# ON CONFLICT replaces the separate callsign existence check; no row back
+# means the callsign is taken.
+SQL_CREATE_INSTALLATION = """
+    INSERT INTO installation (
+        platform_type_id, callsign, geom, altitude_m
+    ) VALUES ($1, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5)
+    ON CONFLICT (callsign) DO NOTHING
+    RETURNING id
+"""
+
+# Bulk variant of SQL_CREATE_INSTALLATION taking one array per column
+SQL_CREATE_INSTALLATIONS = """
+    INSERT INTO installation (
+        platform_type_id, callsign, geom, altitude_m
+    )
+    SELECT pt.id, r.callsign, ST_SetSRID(ST_MakePoint(r.lon, r.lat), 4326)::geography, r.altitude_m
+    FROM unnest($1::text[], $2::text[], $3::float8[], $4::float8[], $5::float8[])
+         AS r(platform_nickname, callsign, lon, lat, altitude_m)
+    JOIN platform_type pt ON pt.nickname = r.platform_nickname
+    ON CONFLICT (callsign) DO NOTHING
+    RETURNING callsign
+"""
+
+# Adds ammo to a launcher in one statement; no row comes back when the
+# callsign doesn't exist. The munition id comes from the reference cache.
+SQL_ARM_LAUNCHER = """
+    INSERT INTO installation_munition (installation_id, munition_type_id, quantity)
+    SELECT i.id, $2, $3 FROM installation i WHERE i.callsign = $1
+    ON CONFLICT (installation_id, munition_type_id)
+    DO UPDATE SET quantity = installation_munition.quantity + EXCLUDED.quantity
+    RETURNING installation_id
+"""
+
+# Resolves the launcher, decrements ammo and numbers the launch in one
+# statement. The munition id comes from the reference cache. The guarded
+# UPDATE only fires when the launcher exists and ammo is available, so it is
+# atomic without an explicit transaction; the launcher's row lock then hands
+# out launch numbers one at a time.
+SQL_LAUNCH_MISSILE = """
+    WITH launcher AS (
+        SELECT 
+            i.id, 
+            i.lon_deg as lon, 
+            i.lat_deg as lat,
+            i.altitude_m::float8 as alt
+        FROM installation i WHERE callsign = $1
+    ),
+    ammo AS (
+        UPDATE installation_munition im
+        SET quantity = im.quantity - 1
+        FROM launcher l
+        WHERE im.installation_id = l.id
+          AND im.munition_type_id = $2
+          AND im.quantity > 0
+        RETURNING im.quantity
+    ),
+    launched AS (
+        UPDATE installation i
+        SET launched_count = i.launched_count + 1
+        FROM launcher l, ammo
+        WHERE i.id = l.id
+        RETURNING i.launched_count
+    )
+    SELECT 
+        l.id, l.lon, l.lat, l.alt,
+        (SELECT quantity FROM ammo) as remaining,
+        (SELECT launched_count FROM launched) as launch_number
+    FROM (SELECT 1) AS one
+    LEFT JOIN launcher l ON TRUE
+"""
+
+@functools.lru_cache(maxsize=None)
+def munition_abbreviation(nickname: str) -> str:
+    """Callsign code for a munition, e.g. 'Hwasong-15' -> 'H15'; memoized per nickname"""
+    return "".join([c for c in nickname if c.isupper() or c.isdigit()])
+
+class SingleFlight:
+    """Share one in-flight call per key between concurrent callers
+
+    A finished result is reused for ttl seconds, so this only fits read-only
+    snapshots that can tolerate being that stale. Failures are not reused.
+    """
+    def __init__(self, ttl: float = 0.25):
+        self.ttl = ttl
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._expires: Dict[str, float] = {}
+    
+    async def do(self, key: str, coro_fn):
+        now = time.monotonic()
+        task = self._tasks.get(key)
+        if (task is None or self._expires[key] <= now
+                or (task.done() and (task.cancelled() or task.exception() is not None))):
+            task = asyncio.ensure_future(coro_fn())
+            self._tasks[key] = task
+            self._expires[key] = now + self.ttl
+        # Shield so one caller disconnecting doesn't cancel the shared query
+        return await asyncio.shield(task)
 
 class MissileState:
     def __init__(self, missile_id, position, velocity, target, fuel_remaining, status="active"):
@@ -19,6 +263,58 @@ class MissileState:
         self.target = target      # [x, y, z]
         self.fuel_remaining = fuel_remaining
         self.status = status
+        # Published every tick, so built once
+        self.callsign = f"ATT_{missile_id[:8]}"
+        # Reused position message; the tick overwrites position and timestamp
+        # in place instead of allocating three dicts per missile
+        self.message: MissilePositionMessage = {
+            "id": missile_id,
+            "callsign": self.callsign,
+            "position": {"x": position[0], "y": position[1], "z": position[2]},
+            "velocity": {"x": velocity[0], "y": velocity[1], "z": velocity[2]},
+            "timestamp": 0.0,
+            "missile_type": "attack"
+        }
+
+class MissileTracks:
+    """Kinematics of in-flight missiles as parallel NumPy arrays
+
+    Row i of positions, velocities and targets belongs to missiles[i], so
+    one tick updates every missile with a few array operations instead of a
+    Python loop per missile.
+    """
+    def __init__(self):
+        self.missiles: List[MissileState] = []
+        self.positions = np.empty((0, 3))
+        self.velocities = np.empty((0, 3))
+        self.targets = np.empty((0, 3))
+    
+    def __len__(self) -> int:
+        return len(self.missiles)
+    
+    def add(self, missiles: List[MissileState]):
+        """Append missiles to the arrays"""
+        self.missiles.extend(missiles)
+        self.positions = np.vstack([self.positions, [m.position for m in missiles]])
+        self.velocities = np.vstack([self.velocities, [m.velocity for m in missiles]])
+        self.targets = np.vstack([self.targets, [m.target for m in missiles]])
+    
+    def step(self, dt: float) -> np.ndarray:
+        """Advance all missiles by dt; returns a mask of those that detonate"""
+        self.positions += self.velocities * dt
+        diff = self.positions - self.targets
+        dist2 = np.einsum("ij,ij->i", diff, diff)
+        return (dist2 < DETONATION_RADIUS_M ** 2) | (self.positions[:, 2] <= 0)
+    
+    def keep(self, mask: np.ndarray):
+        """Drop every row where mask is False"""
+        # Most ticks drop nothing; skip copying every array
+        if mask.all():
+            return
+        self.missiles = [m for m, k in zip(self.missiles, mask) if k]
+        self.positions = self.positions[mask]
+        self.velocities = self.velocities[mask]
+        self.targets = self.targets[mask]
 
 class MessagingService:
     def __init__(self, db_dsn: str, nats_url: str = "nats://nats:4222"):
@@ -26,117 +322,247 @@ class MessagingService:
         self.nats_url = nats_url
         self.db_pool: Optional[asyncpg.Pool] = None
         self.nats_client: Optional[NATS] = None
+        # Pool sizing; defaults target 100-500 concurrent API requests. Size
+        # DB_POOL_MAX to the expected in-flight request count per worker.
+        self.pool_min_size = int(os.getenv("DB_POOL_MIN", "10"))
+        self.pool_max_size = int(os.getenv("DB_POOL_MAX", "50"))
+        self.statement_cache_size = int(os.getenv("DB_STMT_CACHE", "1024"))
+        # Fail fast when the pool is exhausted instead of queueing requests
+        self.acquire_timeout = float(os.getenv("DB_ACQUIRE_TIMEOUT", "0.5"))
         self.active_missiles: Dict[str, MissileState] = {}
+        self.tracks = MissileTracks()
         self.simulation_task = None
+        # Physics runs on its own thread and hands encoded batches to the loop
+        self.simulation_thread: Optional[threading.Thread] = None
+        self.simulation_stop = threading.Event()
+        self.pool_metrics_task = None
+        self.launch_task = None
+        # Queues and locks bind to an event loop; they are created in
+        # initialize() so they belong to the loop that serves requests
+        self.position_queue: Optional[asyncio.Queue] = None
+        self.launch_queue: Optional[asyncio.Queue] = None
+        # nickname -> id for the read-only reference tables, filled lazily
+        self.platform_ids: Dict[str, int] = {}
+        self.munition_ids: Dict[str, int] = {}
+        self.reference_ids_expire = 0.0
+        # Concurrent misses wait for one reload instead of each refetching
+        self.reference_ids_lock: Optional[asyncio.Lock] = None
+        # Coalesces identical concurrent list reads from auto-refreshing UIs
+        self.reads = SingleFlight()
+        self.health_cache: Optional[Dict[str, Any]] = None
+        self.health_cache_expire = 0.0
     
     async def initialize(self):
         """Initialize database connection and NATS client"""
+        self._create_loop_state()
+        
         # Initialize database pool
         self.db_pool = await self._create_db_pool_with_retry()
+        self.pool_metrics_task = asyncio.create_task(self.report_pool_metrics_loop())
+        
+        # Warm the reference caches so the first create or arm is one round trip
+        try:
+            async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+                await self._load_reference_ids(con)
+        except Exception as e:
+            logger.warning("Reference id preload failed, loading on first use: %s", e)
         
         # Initialize NATS client
         self.nats_client = NATS()
-        await self.nats_client.connect(self.nats_url)
-        print("Attack Service messaging initialized")
+        await self.nats_client.connect(
+            self.nats_url,
+            pending_size=NATS_PENDING_SIZE,
+            flusher_queue_size=1024,
+            # Publish-only client; the server never needs to echo our messages
+            no_echo=True
+        )
+        self.launch_task = asyncio.create_task(self.publish_launches_loop())
+        logger.info("Attack Service messaging initialized")
+        self.simulation_thread = threading.Thread(
+            target=self._run_physics,
+            args=(asyncio.get_running_loop(),),
+            name="missile-physics",
+            daemon=True
+        )
+        self.simulation_thread.start()
         self.simulation_task = asyncio.create_task(self.simulate_missiles_loop())
     
     async def shutdown(self):
         """Shutdown connections"""
+        if self.launch_task:
+            self.launch_task.cancel()
         if self.nats_client:
+            # Launches already debited ammo, so don't drop any still queued
+            while not self.launch_queue.empty():
+                await self.nats_client.publish("simulation.launch", self.launch_queue.get_nowait())
             await self.nats_client.close()
         if self.db_pool:
             await self.db_pool.close()
+        self.simulation_stop.set()
         if self.simulation_task:
             self.simulation_task.cancel()
+        if self.pool_metrics_task:
+            self.pool_metrics_task.cancel()
+    
+    def _create_loop_state(self):
+        """Create the queues and locks on the running event loop"""
+        self.position_queue = asyncio.Queue()
+        self.launch_queue = asyncio.Queue(maxsize=LAUNCH_QUEUE_SIZE)
+        self.reference_ids_lock = asyncio.Lock()
     
     async def _create_db_pool_with_retry(self, max_retries=30, delay=2):
         """Create database pool with retry logic for startup timing"""
         for attempt in range(max_retries):
             try:
-                pool = await asyncpg.create_pool(dsn=self.db_dsn)
-                print(f"Database connection established on attempt {attempt + 1}")
+                pool = await asyncpg.create_pool(
+                    dsn=self.db_dsn,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    # Recycle connections periodically so server-side memory
+                    # held by cached plans doesn't grow without bound
+                    max_queries=50000,
+                    max_inactive_connection_lifetime=300,
+                    statement_cache_size=self.statement_cache_size,
+                    # Sent in the startup packet, so no extra round trip. These
+                    # short OLTP statements never benefit from JIT compilation.
+                    server_settings={"jit": "off"},
+                    command_timeout=5
+                )
+                logger.info("Database connection established on attempt %d", attempt + 1)
                 return pool
             except Exception as e:
-                print(f"Database connection attempt {attempt + 1} failed: {e}")
+                logger.warning("Database connection attempt %d failed: %s", attempt + 1, e)
                 if attempt < max_retries - 1:
                     await asyncio.sleep(delay)
                 else:
                     raise
         raise Exception("Failed to connect to database after all retries")
     
-    async def get_platforms(self) -> List[Dict[str, Any]]:
-        """Get all available platform types"""
-        async with self.db_pool.acquire() as con:
-            platforms = await con.fetch("SELECT * FROM platform_type ORDER BY category, nickname")
-            return [dict(p) for p in platforms]
-    
-    async def get_installations(self) -> List[Dict[str, Any]]:
-        """Get all installations"""
-        async with self.db_pool.acquire() as con:
-            installations = await con.fetch("""
-                SELECT i.id, i.callsign, i.geom, i.altitude_m, 
-                       i.heading_deg, i.status,
-                       pt.nickname as platform_nickname, pt.category, pt.is_mobile
-                FROM installation i
-                JOIN platform_type pt ON i.platform_type_id = pt.id
-                ORDER BY pt.category, i.callsign
-            """)
+    async def _load_reference_ids(self, con: asyncpg.Connection):
+        """Reload the platform and munition nickname -> id maps"""
+        seen = self.reference_ids_expire
+        async with self.reference_ids_lock:
+            # Another caller reloaded while this one waited for the lock
+            if self.reference_ids_expire != seen:
+                return
+            platforms = await con.fetch(SQL_GET_PLATFORM_IDS)
+            munitions = await con.fetch(SQL_GET_MUNITION_IDS)
+            self.platform_ids = {p['nickname']: p['id'] for p in platforms}
+            self.munition_ids = {m['nickname']: m['id'] for m in munitions}
+            self.reference_ids_expire = time.monotonic() + REFERENCE_CACHE_TTL
+    
+    def clear_reference_cache(self):
+        """Force the next platform or munition lookup to reload from the database"""
+        self.platform_ids = {}
+        self.munition_ids = {}
+        self.reference_ids_expire = 0.0
+    
+    async def _get_platform_id(self, con: asyncpg.Connection, nickname: str) -> Optional[int]:
+        """Look up a platform id, reloading the cache on a miss or once stale"""
+        if nickname not in self.platform_ids or time.monotonic() >= self.reference_ids_expire:
+            await self._load_reference_ids(con)
+        return self.platform_ids.get(nickname)
+    
+    async def _get_munition_id(self, con: asyncpg.Connection, nickname: str) -> Optional[int]:
+        """Look up a munition id, reloading the cache on a miss or once stale"""
+        if nickname not in self.munition_ids or time.monotonic() >= self.reference_ids_expire:
+            await self._load_reference_ids(con)
+        return self.munition_ids.get(nickname)
+    
+    async def report_pool_metrics_loop(self):
+        """Publish pool gauges periodically
+
+        Gauge.set_function callbacks are not collected in Prometheus
+        multiprocess mode, so the values are pushed instead.
+        """
+        while True:
+            DB_POOL_SIZE.set(self.db_pool.get_size())
+            DB_POOL_IDLE.set(self.db_pool.get_idle_size())
+            await asyncio.sleep(POOL_METRICS_INTERVAL)
+    
+    async def get_platforms(self) -> str:
+        """Get all available platform types as a JSON array"""
+        return await self.reads.do("platforms", self._fetch_platforms)
+    
+    async def _fetch_platforms(self) -> str:
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            return await con.fetchval(SQL_GET_PLATFORMS)
+    
+    async def get_installations(self) -> str:
+        """Get all installations as a JSON array"""
+        return await self.reads.do("installations", self._fetch_installations)
+    
+    async def _fetch_installations(self) -> str:
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            return await con.fetchval(SQL_GET_INSTALLATIONS)
+    
+    async def get_installations_within(self, lat: float, lon: float, radius_m: float,
+                                       limit: int = INSTALLATIONS_WITHIN_LIMIT) -> List[Dict[str, Any]]:
+        """Get up to limit installations within radius_m of a point, nearest first"""
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            installations = await con.fetch(SQL_GET_INSTALLATIONS_WITHIN, lon, lat, radius_m, limit)
             return [dict(i) for i in installations]
     
     async def create_installation(self, platform_nickname: str, callsign: str, 
-                                lat: float, lon: float, altitude_m: float = 0) -> Dict[str, Any]:
-        """Create a new installation"""
-        async with self.db_pool.acquire() as con:
-            # Get platform type ID
-            platform_id = await con.fetchval(
-                "SELECT id FROM platform_type WHERE nickname = $1",
-                platform_nickname
-            )
-            
-            if not platform_id:
+                                lat: float, lon: float, altitude_m: float = 0,
+                                is_mobile: bool = False, ammo_count: int = 0) -> Dict[str, Any]:
+        """Create a new installation
+
+        Mobility is a property of the platform type and munitions are loaded
+        through arm_launcher, so is_mobile and ammo_count are accepted for API
+        compatibility but not stored on the installation.
+        """
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            platform_id = await self._get_platform_id(con, platform_nickname)
+            if platform_id is None:
                 raise ValueError(f"Platform {platform_nickname} not found")
             
-            # Check if callsign already exists
-            existing = await con.fetchval(
-                "SELECT id FROM installation WHERE callsign = $1",
-                callsign
+            installation_id = await con.fetchval(
+                SQL_CREATE_INSTALLATION, platform_id, callsign, lon, lat, altitude_m
             )
             
-            if existing:
+            if installation_id is None:
                 raise ValueError(f"Installation with callsign {callsign} already exists")
             
-            # Create installation
-            installation_id = await con.fetchval("""
-                INSERT INTO installation (
-                    platform_type_id, callsign, geom, altitude_m
-                ) VALUES ($1, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5)
-                RETURNING id
-            """, platform_id, callsign, lon, lat, altitude_m)
-            
             return {
                 "installation_id": installation_id,
                 "callsign": callsign,
                 "status": "created"
             }
     
+    async def create_installations(self, installations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many installations in one statement
+
+        Rows with an unknown platform or a callsign that already exists are
+        skipped and reported back rather than failing the whole batch.
+        """
+        callsigns = [i["callsign"] for i in installations]
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            rows = await con.fetch(
+                SQL_CREATE_INSTALLATIONS,
+                [i["platform_nickname"] for i in installations],
+                callsigns,
+                [i["lon"] for i in installations],
+                [i["lat"] for i in installations],
+                [i.get("altitude_m", 0) for i in installations]
+            )
+        
+        created = {r['callsign'] for r in rows}
+        return {
+            "created": [c for c in callsigns if c in created],
+            "skipped": [c for c in callsigns if c not in created],
+            "status": "created"
+        }
+    
     async def delete_installation(self, callsign: str) -> Dict[str, Any]:
         """Delete a specific installation by callsign"""
-        async with self.db_pool.acquire() as con:
-            # Check if installation exists
-            installation_id = await con.fetchval(
-                "SELECT id FROM installation WHERE callsign = $1",
-                callsign
-            )
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            # No row back means there was nothing to delete
+            installation_id = await con.fetchval(SQL_DELETE_INSTALLATION, callsign)
             
             if not installation_id:
                 raise ValueError(f"Installation {callsign} not found")
             
-            # Delete installation
-            await con.execute(
-                "DELETE FROM installation WHERE callsign = $1",
-                callsign
-            )
-            
             return {
                 "callsign": callsign,
                 "status": "deleted"
@@ -144,12 +570,8 @@ class MessagingService:
     
     async def delete_all_installations(self) -> Dict[str, Any]:
         """Delete all installations"""
-        async with self.db_pool.acquire() as con:
-            # Get count before deletion
-            count = await con.fetchval("SELECT COUNT(*) FROM installation")
-            
-            # Delete all installations
-            await con.execute("DELETE FROM installation")
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            count = await con.fetchval(SQL_DELETE_ALL_INSTALLATIONS)
             
             return {
                 "deleted_count": count,
@@ -158,23 +580,15 @@ class MessagingService:
     
     async def arm_launcher(self, launcher_callsign: str, munition_nickname: str, quantity: int) -> Dict[str, Any]:
         """Arm a launcher with a specific type of munition."""
-        async with self.db_pool.acquire() as con:
-            # Get launcher and munition IDs
-            launcher_id = await con.fetchval("SELECT id FROM installation WHERE callsign = $1", launcher_callsign)
-            if not launcher_id:
-                raise ValueError(f"Launcher with callsign {launcher_callsign} not found")
-
-            munition_id = await con.fetchval("SELECT id FROM munition_type WHERE nickname = $1", munition_nickname)
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            munition_id = await self._get_munition_id(con, munition_nickname)
             if not munition_id:
                 raise ValueError(f"Munition with nickname {munition_nickname} not found")
 
             # Use INSERT ... ON CONFLICT to either add new ammo or update existing count
-            await con.execute("""
-                INSERT INTO installation_munition (installation_id, munition_type_id, quantity)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (installation_id, munition_type_id)
-                DO UPDATE SET quantity = installation_munition.quantity + EXCLUDED.quantity;
-            """, launcher_id, munition_id, quantity)
+            launcher_id = await con.fetchval(SQL_ARM_LAUNCHER, launcher_callsign, munition_id, quantity)
+            if not launcher_id:
+                raise ValueError(f"Launcher with callsign {launcher_callsign} not found")
 
             return {
                 "launcher_callsign": launcher_callsign,
@@ -187,89 +601,68 @@ class MessagingService:
                            target_lat: float, target_lon: float, target_alt: float) -> Dict[str, Any]:
         """Launch a missile from a specific launcher."""
         
-        async with self.db_pool.acquire() as con:
-            # Transaction to ensure atomicity
-            async with con.transaction():
-                # 1. Get launcher and munition info
-                launcher = await con.fetchrow("""
-                    SELECT 
-                        i.id, 
-                        ST_X(i.geom::geometry) as lon, 
-                        ST_Y(i.geom::geometry) as lat,
-                        i.altitude_m as alt
-                    FROM installation i WHERE callsign = $1
-                """, launcher_callsign)
-                if not launcher:
-                    raise ValueError(f"Launcher {launcher_callsign} not found")
-
-                munition_type = await con.fetchrow("SELECT id, nickname FROM munition_type WHERE nickname = $1", munition_nickname)
-                if not munition_type:
-                    raise ValueError(f"Munition type {munition_nickname} not found")
-
-                # 2. Check for available ammunition
-                ammo_record = await con.fetchrow("""
-                    SELECT id, quantity FROM installation_munition
-                    WHERE installation_id = $1 AND munition_type_id = $2
-                """, launcher['id'], munition_type['id'])
-
-                if not ammo_record or ammo_record['quantity'] < 1:
-                    raise ValueError(f"Launcher {launcher_callsign} has no {munition_nickname} ammunition")
-
-                # 3. Decrement ammo count
-                await con.execute(
-                    "UPDATE installation_munition SET quantity = quantity - 1 WHERE id = $1",
-                    ammo_record['id']
-                )
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            munition_id = await self._get_munition_id(con, munition_nickname)
+            launch = await con.fetchrow(SQL_LAUNCH_MISSILE, launcher_callsign, munition_id)
+
+            if launch['id'] is None:
+                raise ValueError(f"Launcher {launcher_callsign} not found")
+            if munition_id is None:
+                raise ValueError(f"Munition type {munition_nickname} not found")
+            if launch['remaining'] is None:
+                raise ValueError(f"Launcher {launcher_callsign} has no {munition_nickname} ammunition")
+
+            new_missile_callsign = f"{launcher_callsign}-{munition_abbreviation(munition_nickname)}-{launch['launch_number']}"
+
+            # Send launch request to simulation service
+            launch_message: LaunchMessage = {
+                "type": "missile_launch",
+                "missile_callsign": new_missile_callsign,
+                "munition_nickname": munition_nickname,
+                "launch_callsign": launcher_callsign,
+                "launch_lat": launch['lat'],
+                "launch_lon": launch['lon'],
+                "launch_alt": launch['alt'],
+                "target_lat": target_lat,
+                "target_lon": target_lon,
+                "target_alt": target_alt,
+                "timestamp": time.time()
+            }
+            
+            if self.nats_client:
+                payload = orjson.dumps(launch_message)
+                try:
+                    self.launch_queue.put_nowait(payload)
+                except asyncio.QueueFull:
+                    await self.nats_client.publish("simulation.launch", payload)
+            
+            return {
+                "status": "launched",
+                "missile_callsign": new_missile_callsign,
+                "launcher_callsign": launcher_callsign,
+                "munition_nickname": munition_nickname
+            }
+
+    async def publish_launches_loop(self):
+        """Drain queued launch messages to NATS, flushing once per batch"""
+        while True:
+            batch = [await self.launch_queue.get()]
+            while len(batch) < LAUNCH_BATCH_SIZE and not self.launch_queue.empty():
+                batch.append(self.launch_queue.get_nowait())
+            try:
+                for payload in batch:
+                    await self.nats_client.publish("simulation.launch", payload)
+                await self.nats_client.flush(timeout=NATS_FLUSH_TIMEOUT)
+            except Exception as e:
+                logger.error("Error publishing launches: %s", e)
 
-                # 4. Generate a new missile callsign
-                fired_count = await con.fetchval("""
-                    SELECT COUNT(*) FROM active_missile WHERE launch_installation_id = $1
-                """, launcher['id'])
-                
-                munition_abbreviation = "".join([c for c in munition_type['nickname'] if c.isupper() or c.isdigit()])
-                new_missile_callsign = f"{launcher_callsign}-{munition_abbreviation}-{fired_count + 1}"
-
-                # 5. Send launch request to simulation service
-                launch_message = {
-                    "type": "missile_launch",
-                    "missile_callsign": new_missile_callsign,
-                    "munition_nickname": munition_nickname,
-                    "launch_callsign": launcher_callsign,
-                    "launch_lat": launcher['lat'],
-                    "launch_lon": launcher['lon'],
-                    "launch_alt": launcher['alt'],
-                    "target_lat": target_lat,
-                    "target_lon": target_lon,
-                    "target_alt": target_alt,
-                    "timestamp": time.time()
-                }
-                
-                if self.nats_client:
-                    await self.nats_client.publish("simulation.launch", json.dumps(launch_message).encode())
-                
-                return {
-                    "status": "launched",
-                    "missile_callsign": new_missile_callsign,
-                    "launcher_callsign": launcher_callsign,
-                    "munition_nickname": munition_nickname
-                }
-    
-    async def get_active_missiles(self) -> List[Dict[str, Any]]:
-        """Get all active missiles"""
-        async with self.db_pool.acquire() as con:
-            missiles = await con.fetch("""
-                SELECT 
-                    am.id as callsign,
-                    mt.nickname as munition_type,
-                    am.status,
-                    am.current_geom,
-                    am.current_altitude_m,
-                    am.launch_ts
-                FROM active_missile am
-                JOIN munition_type mt ON am.munition_type_id = mt.id
-                WHERE am.status = 'active'
-            """)
-            return [dict(m) for m in missiles]
+    async def get_active_missiles(self) -> str:
+        """Get all active missiles as a JSON array"""
+        return await self.reads.do("active_missiles", self._fetch_active_missiles)
+    
+    async def _fetch_active_missiles(self) -> str:
+        async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+            return await con.fetchval(SQL_GET_ACTIVE_MISSILES)
     
     async def get_recent_detections(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent detection events"""
@@ -288,22 +681,13 @@ class MessagingService:
     
     async def health_check(self) -> Dict[str, Any]:
         """Health check endpoint"""
-        db_ok = False
-        nats_ok = False
+        if self.health_cache is not None and time.monotonic() < self.health_cache_expire:
+            return self.health_cache
         
-        # Check DB
-        try:
-            async with self.db_pool.acquire() as con:
-                await con.fetchval("SELECT 1")
-            db_ok = True
-        except Exception as e:
-            print(f"Health check DB error: {e}")
+        # Both probes are round trips, so run them concurrently
+        db_ok, nats_ok = await asyncio.gather(self._ping_db(), self._ping_nats())
         
-        # Check NATS
-        if self.nats_client and self.nats_client.is_connected:
-            nats_ok = True
-            
-        return {
+        result = {
             "service": "attack_service",
             "status": "ok" if db_ok and nats_ok else "degraded",
             "dependencies": {
@@ -311,27 +695,122 @@ class MessagingService:
                 "nats": "ok" if nats_ok else "error"
             }
         }
+        HEALTH_STATUS.set(1 if db_ok and nats_ok else 0)
+        # Only cache success so failures are reported on the next probe
+        if db_ok and nats_ok:
+            self.health_cache = result
+            self.health_cache_expire = time.monotonic() + HEALTH_CACHE_TTL
+        return result
+    
+    async def _ping_db(self) -> bool:
+        try:
+            async with self.db_pool.acquire(timeout=self.acquire_timeout) as con:
+                await con.fetchval("SELECT 1", timeout=HEALTH_PROBE_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.error("Health check DB error: %s", e)
+            return False
+    
+    async def _ping_nats(self) -> bool:
+        if not (self.nats_client and self.nats_client.is_connected):
+            return False
+        # flush waits for the server's PONG, so a stalled connection fails
+        try:
+            await self.nats_client.flush(timeout=HEALTH_PROBE_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.error("Health check NATS error: %s", e)
+            return False
+
+    def _sync_tracks(self):
+        """Match the track arrays to the active entries in active_missiles
+
+        The event loop may add or remove missiles while this runs; single
+        dict lookups and tuple(values()) are atomic under the GIL, iterating
+        the dict itself is not.
+        """
+        if len(self.tracks):
+            self.tracks.keep(np.array([
+                m.status == "active" and self.active_missiles.get(m.missile_id) is m
+                for m in self.tracks.missiles
+            ], dtype=bool))
+        # Every tracked missile was just found in active_missiles, so equal
+        # sizes mean nothing is new; skip the scan in the steady state
+        if len(self.active_missiles) == len(self.tracks):
+            return
+        tracked = set(map(id, self.tracks.missiles))
+        new = [m for m in tuple(self.active_missiles.values())
+               if m.status == "active" and id(m) not in tracked]
+        if new:
+            self.tracks.add(new)
+    
+    def simulation_tick(self) -> Optional[bytes]:
+        """Advance every active missile one tick
 
+        Returns the encoded missile.positions batch, or None when nothing is
+        in flight. Runs on the physics thread, so it must not await.
+        """
+        # Idle ticks return before allocating anything
+        if not self.active_missiles and not len(self.tracks):
+            return None
+        self._sync_tracks()
+        if not len(self.tracks):
+            return None
+        timestamp = time.time()
+        detonated = self.tracks.step(SIMULATION_TICK_S)
+        frames: List[MissilePositionMessage] = []
+        for missile, position, hit in zip(
+                self.tracks.missiles, self.tracks.positions.tolist(), detonated.tolist()):
+            missile.position = position
+            if hit:
+                missile.status = "detonated"
+                # Evict so later ticks only scan missiles still in flight
+                self.active_missiles.pop(missile.missile_id, None)
+            # Velocity is constant in flight, so only position and time change
+            msg = missile.message
+            p = msg["position"]
+            p["x"], p["y"], p["z"] = position
+            msg["timestamp"] = timestamp
+            frames.append(msg)
+        self.tracks.keep(~detonated)
+        batch: MissilePositionsMessage = {"timestamp": timestamp, "missiles": frames}
+        return orjson.dumps(batch)
+    
+    def _run_physics(self, loop: asyncio.AbstractEventLoop):
+        """Physics thread: tick at 10 Hz off the event loop"""
+        next_tick = time.perf_counter()
+        while not self.simulation_stop.is_set():
+            next_tick += SIMULATION_TICK_S
+            started = time.perf_counter()
+            try:
+                payload = self.simulation_tick()
+            except Exception as e:
+                logger.error("Error in missile physics tick: %s", e)
+                payload = None
+            if payload is not None:
+                # Idle ticks are skipped so they don't swamp the histogram
+                SIMULATION_TICK_SECONDS.observe(time.perf_counter() - started)
+                try:
+                    loop.call_soon_threadsafe(self.position_queue.put_nowait, payload)
+                except RuntimeError:
+                    # Event loop closed during shutdown
+                    break
+            self.simulation_stop.wait(max(0.0, next_tick - time.perf_counter()))
+    
     async def simulate_missiles_loop(self):
+        """Publish the batches produced by the physics thread
+
+        Normally one batch is waiting per tick; if the loop fell behind,
+        up to MAX_PUBLISH_BATCH queued batches are published back to back and
+        flushed together.
+        """
         while True:
-            await asyncio.sleep(0.1)  # 10 Hz
-            for missile_id, missile in list(self.active_missiles.items()):
-                if missile.status != "active":
-                    continue
-                # Simple physics: move toward target
-                for i in range(3):
-                    missile.position[i] += missile.velocity[i] * 0.1
-                # Publish position
-                msg = {
-                    "id": missile_id,
-                    "callsign": f"ATT_{missile_id[:8]}",
-                    "position": {"x": missile.position[0], "y": missile.position[1], "z": missile.position[2]},
-                    "velocity": {"x": missile.velocity[0], "y": missile.velocity[1], "z": missile.velocity[2]},
-                    "timestamp": time.time(),
-                    "missile_type": "attack"
-                }
-                await self.nats_client.publish("missile.position", json.dumps(msg).encode())
-                # End condition: reached target or below ground
-                dist = math.sqrt(sum((missile.position[i] - missile.target[i])**2 for i in range(3)))
-                if dist < 100 or missile.position[2] <= 0:
-                    missile.status = "detonated" 
\ No newline at end of file
+            batch = [await self.position_queue.get()]
+            while len(batch) < MAX_PUBLISH_BATCH and not self.position_queue.empty():
+                batch.append(self.position_queue.get_nowait())
+            try:
+                for payload in batch:
+                    await self.nats_client.publish("missile.positions", payload)
+                await self.nats_client.flush(timeout=NATS_FLUSH_TIMEOUT)
+            except Exception as e:
+                logger.error("Error publishing missile positions: %s", e)
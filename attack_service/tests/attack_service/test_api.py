@@ -1,36 +1,95 @@
 """
 Unit tests for the Attack Service API
 """
+import json
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, call
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
-from attack_service.api import AttackServiceAPI, ArmRequest, LaunchRequest, InstallationRequest
+from attack_service.api import AttackServiceAPI, ArmRequest, LaunchRequest, InstallationRequest, STREAM_THRESHOLD
 from attack_service.messaging import MessagingService
 
 
+# Request payloads shared by the endpoint and model tests; the endpoint
+# tests also expect the handler to pass them on as keyword arguments.
+# Read-only so no test can change them for the others
+VALID_ARM_DATA = MappingProxyType({
+    "launcher_callsign": "ALPHA-1",
+    "munition_nickname": "PAC-3",
+    "quantity": 5
+})
+
+VALID_LAUNCH_DATA = MappingProxyType({
+    "launcher_callsign": "ALPHA-1",
+    "munition_nickname": "PAC-3",
+    "target_lat": 40.7128,
+    "target_lon": -74.0060,
+    "target_alt": 1000
+})
+
+MINIMAL_LAUNCH_DATA = MappingProxyType({
+    "launcher_callsign": "ALPHA-1",
+    "munition_nickname": "PAC-3",
+    "target_lat": 40.7128,
+    "target_lon": -74.0060
+})
+
+VALID_INSTALLATION_DATA = MappingProxyType({
+    "platform_nickname": "Patriot",
+    "callsign": "ALPHA-1",
+    "lat": 40.7128,
+    "lon": -74.0060,
+    "altitude_m": 100,
+    "is_mobile": False,
+    "ammo_count": 10
+})
+
+MINIMAL_INSTALLATION_DATA = MappingProxyType({
+    "platform_nickname": "Patriot",
+    "callsign": "ALPHA-1",
+    "lat": 40.7128,
+    "lon": -74.0060
+})
+
+# Request bodies encoded once and posted with content= so httpx doesn't
+# re-serialize the same payload in every test
+JSON_HEADERS = {"content-type": "application/json"}
+VALID_ARM_BODY = json.dumps(dict(VALID_ARM_DATA)).encode()
+VALID_LAUNCH_BODY = json.dumps(dict(VALID_LAUNCH_DATA)).encode()
+MINIMAL_LAUNCH_BODY = json.dumps(dict(MINIMAL_LAUNCH_DATA)).encode()
+VALID_INSTALLATION_BODY = json.dumps(dict(VALID_INSTALLATION_DATA)).encode()
+MINIMAL_INSTALLATION_BODY = json.dumps(dict(MINIMAL_INSTALLATION_DATA)).encode()
+
+
 @pytest.mark.unit
 class TestAttackServiceAPI:
     """Test cases for AttackServiceAPI"""
     
-    @pytest.fixture
+    # The app and client are built once; the mock is reset before each test
+    @pytest.fixture(scope="session")
     def mock_messaging_service(self):
         """Create a mock messaging service"""
         mock = AsyncMock(spec=MessagingService)
         return mock
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def api_service(self, mock_messaging_service):
         """Create API service with mocked messaging"""
         return AttackServiceAPI(mock_messaging_service)
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def client(self, api_service):
         """Create test client"""
         return TestClient(api_service.app)
     
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, mock_messaging_service):
+        """Clear return values and side effects left by the previous test"""
+        mock_messaging_service.reset_mock(return_value=True, side_effect=True)
+    
     def test_root_endpoint(self, client):
         """Test the root endpoint"""
         response = client.get("/")
@@ -39,46 +98,34 @@ class TestAttackServiceAPI:
         assert data["message"] == "Missile Defense Attack Service v2.0"
         assert data["status"] == "operational"
     
-    @pytest.mark.asyncio
-    async def test_get_platforms(self, api_service, mock_messaging_service):
+    def test_get_platforms(self, client, mock_messaging_service):
         """Test getting platforms"""
         expected_platforms = [
             {"id": 1, "nickname": "Patriot", "category": "SAM"},
             {"id": 2, "nickname": "THAAD", "category": "ABM"}
         ]
-        mock_messaging_service.get_platforms.return_value = expected_platforms
+        mock_messaging_service.get_platforms.return_value = json.dumps(expected_platforms)
         
-        response = await api_service.app.get("/platforms")
+        response = client.get("/platforms")
         assert response.status_code == 200
         assert response.json() == expected_platforms
         mock_messaging_service.get_platforms.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_get_installations(self, api_service, mock_messaging_service):
+    def test_get_installations(self, client, mock_messaging_service):
         """Test getting installations"""
         expected_installations = [
             {"id": 1, "callsign": "ALPHA-1", "platform_nickname": "Patriot"},
             {"id": 2, "callsign": "BRAVO-1", "platform_nickname": "THAAD"}
         ]
-        mock_messaging_service.get_installations.return_value = expected_installations
+        mock_messaging_service.get_installations.return_value = json.dumps(expected_installations)
         
-        response = await api_service.app.get("/installations")
+        response = client.get("/installations")
         assert response.status_code == 200
         assert response.json() == expected_installations
         mock_messaging_service.get_installations.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_create_installation_success(self, api_service, mock_messaging_service):
+    def test_create_installation_success(self, client, mock_messaging_service):
         """Test successful installation creation"""
-        request_data = {
-            "platform_nickname": "Patriot",
-            "callsign": "ALPHA-1",
-            "lat": 40.7128,
-            "lon": -74.0060,
-            "altitude_m": 100,
-            "is_mobile": False,
-            "ammo_count": 10
-        }
         expected_response = {
             "installation_id": 1,
             "callsign": "ALPHA-1",
@@ -86,21 +133,12 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.create_installation.return_value = expected_response
         
-        response = await api_service.app.post("/installations", json=request_data)
+        response = client.post("/installations", content=VALID_INSTALLATION_BODY, headers=JSON_HEADERS)
         assert response.status_code == 200
         assert response.json() == expected_response
-        mock_messaging_service.create_installation.assert_called_once_with(
-            platform_nickname="Patriot",
-            callsign="ALPHA-1",
-            lat=40.7128,
-            lon=-74.0060,
-            altitude_m=100,
-            is_mobile=False,
-            ammo_count=10
-        )
-    
-    @pytest.mark.asyncio
-    async def test_create_installation_validation_error(self, api_service, mock_messaging_service):
+        assert mock_messaging_service.create_installation.call_args_list == [call(**VALID_INSTALLATION_DATA)]
+    
+    def test_create_installation_validation_error(self, client, mock_messaging_service):
         """Test installation creation with validation error"""
         request_data = {
             "platform_nickname": "InvalidPlatform",
@@ -110,27 +148,80 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.create_installation.side_effect = ValueError("Platform InvalidPlatform not found")
         
-        response = await api_service.app.post("/installations", json=request_data)
+        response = client.post("/installations", json=request_data)
         assert response.status_code == 400
         assert "Platform InvalidPlatform not found" in response.json()["detail"]
     
-    @pytest.mark.asyncio
-    async def test_create_installation_server_error(self, api_service, mock_messaging_service):
+    def test_create_installation_server_error(self, client, mock_messaging_service):
         """Test installation creation with server error"""
-        request_data = {
-            "platform_nickname": "Patriot",
-            "callsign": "ALPHA-1",
-            "lat": 40.7128,
-            "lon": -74.0060
-        }
         mock_messaging_service.create_installation.side_effect = Exception("Database error")
         
-        response = await api_service.app.post("/installations", json=request_data)
+        response = client.post("/installations", content=MINIMAL_INSTALLATION_BODY, headers=JSON_HEADERS)
         assert response.status_code == 500
         assert "Internal server error" in response.json()["detail"]
     
-    @pytest.mark.asyncio
-    async def test_delete_installation_success(self, api_service, mock_messaging_service):
+    def test_create_installations_batch(self, client, mock_messaging_service):
+        """Test bulk installation creation"""
+        request_data = [
+            {"platform_nickname": "Patriot", "callsign": "ALPHA-1", "lat": 40.7128, "lon": -74.0060},
+            {"platform_nickname": "THAAD", "callsign": "BRAVO-1", "lat": 41.0, "lon": -73.0}
+        ]
+        expected_response = {"created": ["ALPHA-1", "BRAVO-1"], "skipped": [], "status": "created"}
+        mock_messaging_service.create_installations.return_value = expected_response
+        
+        response = client.post("/installations/batch", json=request_data)
+        assert response.status_code == 200
+        assert response.json() == expected_response
+        mock_messaging_service.create_installations.assert_called_once()
+        installations = mock_messaging_service.create_installations.call_args[0][0]
+        assert [i["callsign"] for i in installations] == ["ALPHA-1", "BRAVO-1"]
+    
+    def test_get_recent_detections_streams_large_lists(self, client, mock_messaging_service):
+        """Test that very large lists are streamed as a single JSON array"""
+        limit = STREAM_THRESHOLD * 2 + 1
+        expected_detections = [{"id": i, "callsign": f"TRACK-{i}"} for i in range(limit)]
+        mock_messaging_service.get_recent_detections.return_value = expected_detections
+        
+        response = client.get("/detections/recent", params={"limit": limit})
+        assert response.status_code == 200
+        assert "content-length" not in response.headers
+        assert response.json() == expected_detections
+    
+    def test_get_installations_nearby(self, client, mock_messaging_service):
+        """Test radius search passes the point and bounds through"""
+        expected_installations = [
+            {"id": 1, "callsign": "THAAD-ALPHA", "lon": -157.85, "lat": 21.32, "distance_m": 1200.0}
+        ]
+        mock_messaging_service.get_installations_within.return_value = expected_installations
+        
+        response = client.get("/installations/nearby", params={"lat": 21.30, "lon": -157.86, "radius_m": 5000, "limit": 10})
+        assert response.status_code == 200
+        assert response.json() == expected_installations
+        mock_messaging_service.get_installations_within.assert_called_once_with(21.30, -157.86, 5000, 10)
+    
+    def test_get_installations_nearby_limit_is_capped(self, client, mock_messaging_service):
+        """Test that the radius search rejects limits above the query cap"""
+        response = client.get("/installations/nearby", params={"lat": 21.30, "lon": -157.86, "radius_m": 5000, "limit": 100000})
+        assert response.status_code == 422
+        mock_messaging_service.get_installations_within.assert_not_called()
+    
+    def test_history_limit_is_capped(self, client, mock_messaging_service):
+        """Test that history endpoints reject unbounded limits"""
+        response = client.get("/detections/recent", params={"limit": 100000})
+        assert response.status_code == 422
+        mock_messaging_service.get_recent_detections.assert_not_called()
+    
+    def test_database_busy_returns_503(self, client, mock_messaging_service):
+        """Test that pool exhaustion is shed with a 503"""
+        mock_messaging_service.get_installations.side_effect = asyncio.TimeoutError()
+        mock_messaging_service.arm_launcher.side_effect = asyncio.TimeoutError()
+        
+        assert client.get("/installations").status_code == 503
+        response = client.post("/arm", content=VALID_ARM_BODY, headers=JSON_HEADERS)
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Database busy, retry later"
+    
+    def test_delete_installation_success(self, client, mock_messaging_service):
         """Test successful installation deletion"""
         expected_response = {
             "callsign": "ALPHA-1",
@@ -138,41 +229,33 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.delete_installation.return_value = expected_response
         
-        response = await api_service.app.delete("/installations/ALPHA-1")
+        response = client.delete("/installations/ALPHA-1")
         assert response.status_code == 200
         assert response.json()["message"] == "Installation ALPHA-1 deleted successfully"
         mock_messaging_service.delete_installation.assert_called_once_with("ALPHA-1")
     
-    @pytest.mark.asyncio
-    async def test_delete_installation_not_found(self, api_service, mock_messaging_service):
+    def test_delete_installation_not_found(self, client, mock_messaging_service):
         """Test deletion of non-existent installation"""
         mock_messaging_service.delete_installation.side_effect = ValueError("Installation ALPHA-1 not found")
         
-        response = await api_service.app.delete("/installations/ALPHA-1")
+        response = client.delete("/installations/ALPHA-1")
         assert response.status_code == 404
         assert "Installation ALPHA-1 not found" in response.json()["detail"]
     
-    @pytest.mark.asyncio
-    async def test_delete_all_installations(self, api_service, mock_messaging_service):
+    def test_delete_all_installations(self, client, mock_messaging_service):
         """Test deletion of all installations"""
         mock_messaging_service.delete_all_installations.return_value = {
             "deleted_count": 5,
             "status": "all_deleted"
         }
         
-        response = await api_service.app.delete("/installations")
+        response = client.delete("/installations")
         assert response.status_code == 200
         assert response.json()["message"] == "All installations deleted successfully"
         mock_messaging_service.delete_all_installations.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_arm_launcher_success(self, api_service, mock_messaging_service):
+    def test_arm_launcher_success(self, client, mock_messaging_service):
         """Test successful launcher arming"""
-        request_data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "quantity": 5
-        }
         expected_response = {
             "launcher_callsign": "ALPHA-1",
             "munition_nickname": "PAC-3",
@@ -181,17 +264,12 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.arm_launcher.return_value = expected_response
         
-        response = await api_service.app.post("/arm", json=request_data)
+        response = client.post("/arm", content=VALID_ARM_BODY, headers=JSON_HEADERS)
         assert response.status_code == 200
         assert response.json() == expected_response
-        mock_messaging_service.arm_launcher.assert_called_once_with(
-            launcher_callsign="ALPHA-1",
-            munition_nickname="PAC-3",
-            quantity=5
-        )
-    
-    @pytest.mark.asyncio
-    async def test_arm_launcher_validation_error(self, api_service, mock_messaging_service):
+        assert mock_messaging_service.arm_launcher.call_args_list == [call(**VALID_ARM_DATA)]
+    
+    def test_arm_launcher_validation_error(self, client, mock_messaging_service):
         """Test launcher arming with validation error"""
         request_data = {
             "launcher_callsign": "INVALID-1",
@@ -200,20 +278,12 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.arm_launcher.side_effect = ValueError("Launcher with callsign INVALID-1 not found")
         
-        response = await api_service.app.post("/arm", json=request_data)
+        response = client.post("/arm", json=request_data)
         assert response.status_code == 400
         assert "Launcher with callsign INVALID-1 not found" in response.json()["detail"]
     
-    @pytest.mark.asyncio
-    async def test_launch_missile_success(self, api_service, mock_messaging_service):
+    def test_launch_missile_success(self, client, mock_messaging_service):
         """Test successful missile launch"""
-        request_data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "target_lat": 40.7128,
-            "target_lon": -74.0060,
-            "target_alt": 1000
-        }
         expected_response = {
             "missile_id": "MISSILE-001",
             "status": "launched",
@@ -221,48 +291,33 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.launch_missile.return_value = expected_response
         
-        response = await api_service.app.post("/launch", json=request_data)
+        response = client.post("/launch", content=VALID_LAUNCH_BODY, headers=JSON_HEADERS)
         assert response.status_code == 200
         assert response.json() == expected_response
-        mock_messaging_service.launch_missile.assert_called_once_with(
-            launcher_callsign="ALPHA-1",
-            munition_nickname="PAC-3",
-            target_lat=40.7128,
-            target_lon=-74.0060,
-            target_alt=1000
-        )
-    
-    @pytest.mark.asyncio
-    async def test_launch_missile_validation_error(self, api_service, mock_messaging_service):
+        assert mock_messaging_service.launch_missile.call_args_list == [call(**VALID_LAUNCH_DATA)]
+    
+    def test_launch_missile_validation_error(self, client, mock_messaging_service):
         """Test missile launch with validation error"""
-        request_data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "target_lat": 40.7128,
-            "target_lon": -74.0060
-        }
         mock_messaging_service.launch_missile.side_effect = ValueError("Insufficient ammunition")
         
-        response = await api_service.app.post("/launch", json=request_data)
+        response = client.post("/launch", content=MINIMAL_LAUNCH_BODY, headers=JSON_HEADERS)
         assert response.status_code == 400
         assert "Insufficient ammunition" in response.json()["detail"]
     
-    @pytest.mark.asyncio
-    async def test_get_active_missiles(self, api_service, mock_messaging_service):
+    def test_get_active_missiles(self, client, mock_messaging_service):
         """Test getting active missiles"""
         expected_missiles = [
             {"missile_id": "MISSILE-001", "status": "active", "position": [100, 200, 1000]},
             {"missile_id": "MISSILE-002", "status": "active", "position": [150, 250, 1200]}
         ]
-        mock_messaging_service.get_active_missiles.return_value = expected_missiles
+        mock_messaging_service.get_active_missiles.return_value = json.dumps(expected_missiles)
         
-        response = await api_service.app.get("/missiles/active")
+        response = client.get("/missiles/active")
         assert response.status_code == 200
         assert response.json() == expected_missiles
         mock_messaging_service.get_active_missiles.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_get_recent_detections(self, api_service, mock_messaging_service):
+    def test_get_recent_detections(self, client, mock_messaging_service):
         """Test getting recent detections"""
         expected_detections = [
             {"id": 1, "event_type": "detection", "timestamp": "2024-01-01T12:00:00Z"},
@@ -270,13 +325,12 @@ class TestAttackServiceAPI:
         ]
         mock_messaging_service.get_recent_detections.return_value = expected_detections
         
-        response = await api_service.app.get("/detections/recent?limit=10")
+        response = client.get("/detections/recent?limit=10")
         assert response.status_code == 200
         assert response.json() == expected_detections
         mock_messaging_service.get_recent_detections.assert_called_once_with(10)
     
-    @pytest.mark.asyncio
-    async def test_get_recent_engagements(self, api_service, mock_messaging_service):
+    def test_get_recent_engagements(self, client, mock_messaging_service):
         """Test getting recent engagements"""
         expected_engagements = [
             {"id": 1, "event_type": "engagement", "timestamp": "2024-01-01T12:00:00Z"},
@@ -284,13 +338,12 @@ class TestAttackServiceAPI:
         ]
         mock_messaging_service.get_recent_engagements.return_value = expected_engagements
         
-        response = await api_service.app.get("/engagements/recent?limit=20")
+        response = client.get("/engagements/recent?limit=20")
         assert response.status_code == 200
         assert response.json() == expected_engagements
         mock_messaging_service.get_recent_engagements.assert_called_once_with(20)
     
-    @pytest.mark.asyncio
-    async def test_get_recent_detonations(self, api_service, mock_messaging_service):
+    def test_get_recent_detonations(self, client, mock_messaging_service):
         """Test getting recent detonations"""
         expected_detonations = [
             {"id": 1, "event_type": "detonation", "timestamp": "2024-01-01T12:00:00Z"},
@@ -298,13 +351,12 @@ class TestAttackServiceAPI:
         ]
         mock_messaging_service.get_recent_detonations.return_value = expected_detonations
         
-        response = await api_service.app.get("/detonations/recent")
+        response = client.get("/detonations/recent")
         assert response.status_code == 200
         assert response.json() == expected_detonations
         mock_messaging_service.get_recent_detonations.assert_called_once_with(50)  # default limit
     
-    @pytest.mark.asyncio
-    async def test_health_check(self, api_service, mock_messaging_service):
+    def test_health_check(self, client, mock_messaging_service):
         """Test health check endpoint"""
         expected_health = {
             "status": "healthy",
@@ -313,7 +365,7 @@ class TestAttackServiceAPI:
         }
         mock_messaging_service.health_check.return_value = expected_health
         
-        response = await api_service.app.get("/health")
+        response = client.get("/health")
         assert response.status_code == 200
         assert response.json() == expected_health
         mock_messaging_service.health_check.assert_called_once()
@@ -325,26 +377,14 @@ class TestPydanticModels:
     
     def test_arm_request_valid(self):
         """Test valid ArmRequest"""
-        data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "quantity": 5
-        }
-        request = ArmRequest(**data)
+        request = ArmRequest.model_validate(VALID_ARM_DATA)
         assert request.launcher_callsign == "ALPHA-1"
         assert request.munition_nickname == "PAC-3"
         assert request.quantity == 5
     
     def test_launch_request_valid(self):
         """Test valid LaunchRequest"""
-        data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "target_lat": 40.7128,
-            "target_lon": -74.0060,
-            "target_alt": 1000
-        }
-        request = LaunchRequest(**data)
+        request = LaunchRequest.model_validate(VALID_LAUNCH_DATA)
         assert request.launcher_callsign == "ALPHA-1"
         assert request.munition_nickname == "PAC-3"
         assert request.target_lat == 40.7128
@@ -353,27 +393,12 @@ class TestPydanticModels:
     
     def test_launch_request_default_altitude(self):
         """Test LaunchRequest with default altitude"""
-        data = {
-            "launcher_callsign": "ALPHA-1",
-            "munition_nickname": "PAC-3",
-            "target_lat": 40.7128,
-            "target_lon": -74.0060
-        }
-        request = LaunchRequest(**data)
+        request = LaunchRequest.model_validate(MINIMAL_LAUNCH_DATA)
         assert request.target_alt == 0  # default value
     
     def test_installation_request_valid(self):
         """Test valid InstallationRequest"""
-        data = {
-            "platform_nickname": "Patriot",
-            "callsign": "ALPHA-1",
-            "lat": 40.7128,
-            "lon": -74.0060,
-            "altitude_m": 100,
-            "is_mobile": False,
-            "ammo_count": 10
-        }
-        request = InstallationRequest(**data)
+        request = InstallationRequest.model_validate(VALID_INSTALLATION_DATA)
         assert request.platform_nickname == "Patriot"
         assert request.callsign == "ALPHA-1"
         assert request.lat == 40.7128
@@ -384,13 +409,7 @@ class TestPydanticModels:
     
     def test_installation_request_defaults(self):
         """Test InstallationRequest with default values"""
-        data = {
-            "platform_nickname": "Patriot",
-            "callsign": "ALPHA-1",
-            "lat": 40.7128,
-            "lon": -74.0060
-        }
-        request = InstallationRequest(**data)
+        request = InstallationRequest.model_validate(MINIMAL_INSTALLATION_DATA)
         assert request.altitude_m == 0
         assert request.is_mobile is False
         assert request.ammo_count == 0 
\ No newline at end of file
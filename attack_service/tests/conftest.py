@@ -0,0 +1,17 @@
+"""
+Shared pytest configuration for the Attack Service tests
+"""
+import asyncio
+import pytest
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole run instead of one per async test
+
+    pytest-asyncio 0.21 takes the loop scope from this fixture; newer
+    releases configure it with asyncio_default_*_loop_scope instead.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -2,6 +2,7 @@
 API endpoints for the Battery Simulation Service.
 """
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from prometheus_client import Counter
 
@@ -33,7 +34,12 @@ class LaunchRequest(BaseModel):
 class BatterySimAPI:
     def __init__(self, messaging_service: BatteryMessagingService):
         self.messaging = messaging_service
-        self.app = FastAPI(title="Missile Defense Battery Simulation Service", version="2.0.0")
+        # Handlers return plain dicts; orjson encodes them without the stdlib json pass
+        self.app = FastAPI(
+            title="Missile Defense Battery Simulation Service",
+            version="2.0.0",
+            default_response_class=ORJSONResponse
+        )
         self._setup_routes()
 
     def _setup_routes(self):
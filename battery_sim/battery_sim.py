@@ -3,16 +3,33 @@ Main entry point for the Battery Simulation Service.
 This service is responsible for managing defensive battery installations and launching interceptors.
 """
 import os
+import queue
 import asyncio
+import logging
+import logging.handlers
 from prometheus_client import start_http_server
 import uvicorn
 
 from api import BatterySimAPI
 from messaging import BatteryMessagingService
 
+logger = logging.getLogger(__name__)
+
 # Start Prometheus metrics server for operational monitoring
 start_http_server(8000)
 
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue; a listener thread does the stdout writes"""
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
 async def main():
     """Initializes and runs the Battery Simulation Service."""
     db_dsn = os.getenv("DB_DSN")
@@ -32,14 +49,14 @@ async def main():
     @app.on_event("startup")
     async def startup():
         """Handles application startup logic."""
-        print("Battery Simulation Service starting up...")
+        logger.info("Battery Simulation Service starting up on %s...", type(asyncio.get_running_loop()).__name__)
         # Start any background tasks if necessary, like listening to NATS subjects
         asyncio.create_task(messaging_service.listen_for_engagement_orders())
 
     @app.on_event("shutdown")
     async def shutdown():
         """Handles application shutdown logic."""
-        print("Battery Simulation Service shutting down...")
+        logger.info("Battery Simulation Service shutting down...")
         await messaging_service.shutdown()
 
     # Configure and run the FastAPI server
@@ -47,10 +64,20 @@ async def main():
         app=app,
         host="0.0.0.0",
         port=9001,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
     server = uvicorn.Server(config)
     await server.serve()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    log_listener = configure_logging()
+    try:
+        # uvicorn.Config's loop setting is only applied by uvicorn.run; the
+        # server here is awaited inside asyncio.run, so install uvloop first
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
\ No newline at end of file
@@ -2,27 +2,126 @@
 Messaging service for the Battery Simulation Service.
 Handles all database interactions and NATS communication.
 """
+import os
 import asyncio
+import logging
+import functools
 import asyncpg
 import nats
 from nats.aio.client import Client as NATS
-import json
+import orjson
 import time
 from typing import Optional, Dict, List, Any
 
+logger = logging.getLogger(__name__)
+
+# Resolves the platform and inserts the battery in one statement. asyncpg
+# prepares it once per connection and reuses it from the statement cache,
+# so PostGIS function lookup and planning happen only on first use.
+# platform_id is NULL for a non counter-defense platform and installation_id
+# is NULL when the callsign is already taken.
+SQL_CREATE_BATTERY = """
+    WITH pt AS (
+        SELECT id FROM platform_type WHERE nickname = $1 AND category = 'counter_defense'
+    ),
+    ins AS (
+        INSERT INTO installation (platform_type_id, callsign, geom, altitude_m)
+        SELECT pt.id, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5 FROM pt
+        ON CONFLICT (callsign) DO NOTHING
+        RETURNING id
+    )
+    SELECT (SELECT id FROM pt) AS platform_id, (SELECT id FROM ins) AS installation_id
+"""
+
+# Resolves the battery and munition and adds the ammo in one round trip.
+# The upsert only runs when both exist; their ids come back NULL otherwise.
+SQL_ARM_BATTERY = """
+    WITH battery AS (
+        SELECT id FROM installation WHERE callsign = $1
+    ),
+    munition AS (
+        SELECT id FROM munition_type WHERE nickname = $2 AND category = 'defense'
+    ),
+    armed AS (
+        INSERT INTO installation_munition (installation_id, munition_type_id, quantity)
+        SELECT b.id, m.id, $3 FROM battery b, munition m
+        ON CONFLICT (installation_id, munition_type_id)
+        DO UPDATE SET quantity = installation_munition.quantity + EXCLUDED.quantity
+        RETURNING installation_id
+    )
+    SELECT (SELECT id FROM battery) AS battery_id, (SELECT id FROM munition) AS munition_id
+"""
+
+# Resolves the battery and munition, decrements ammo and numbers the launch
+# in one round trip. The decrement only matches when ammo is left,
+# so concurrent orders can't drive quantity negative. Each lookup comes back
+# NULL when it fails so the caller can report which one.
+SQL_LAUNCH_INTERCEPTOR = """
+    WITH battery AS (
+        SELECT
+            i.id,
+            i.lon_deg as lon,
+            i.lat_deg as lat,
+            i.altitude_m::float8 as alt
+        FROM installation i WHERE i.callsign = $1
+    ),
+    munition AS (
+        SELECT id FROM munition_type WHERE nickname = $2 AND category = 'defense'
+    ),
+    ammo AS (
+        UPDATE installation_munition im
+        SET quantity = im.quantity - 1
+        FROM battery b, munition m
+        WHERE im.installation_id = b.id
+          AND im.munition_type_id = m.id
+          AND im.quantity > 0
+        RETURNING im.quantity
+    ),
+    launched AS (
+        UPDATE installation i
+        SET launched_count = i.launched_count + 1
+        FROM battery b, ammo
+        WHERE i.id = b.id
+        RETURNING i.launched_count
+    )
+    SELECT
+        b.id, b.lon, b.lat, b.alt,
+        (SELECT id FROM munition) as munition_id,
+        (SELECT quantity FROM ammo) as remaining,
+        (SELECT launched_count FROM launched) as launch_number
+    FROM (SELECT 1) AS one
+    LEFT JOIN battery b ON TRUE
+"""
+
+@functools.lru_cache(maxsize=None)
+def munition_abbreviation(nickname: str) -> str:
+    """Interceptor callsign code, e.g. 'SM-3' -> 'SM3'"""
+    return "".join([c for c in nickname if c.isupper() or c.isdigit()])
+
 class BatteryMessagingService:
     def __init__(self, db_dsn: str, nats_url: str):
         self.db_dsn = db_dsn
         self.nats_url = nats_url
         self.db_pool: Optional[asyncpg.Pool] = None
         self.nats_client: Optional[NATS] = None
+        # Engagement orders arrive in bursts; the asyncpg default of 10
+        # connections serializes them behind one another
+        self.pool_min_size = int(os.getenv("DB_POOL_MIN", "10"))
+        self.pool_max_size = int(os.getenv("DB_POOL_MAX", "50"))
 
     async def initialize(self):
         """Initializes the database pool and NATS client."""
-        self.db_pool = await asyncpg.create_pool(dsn=self.db_dsn)
+        self.db_pool = await asyncpg.create_pool(
+            dsn=self.db_dsn,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            max_queries=50000,
+            max_inactive_connection_lifetime=300,
+            command_timeout=60
+        )
         self.nats_client = NATS()
         await self.nats_client.connect(self.nats_url)
-        print("Battery Messaging Service initialized.")
+        logger.info("Battery Messaging Service initialized.")
 
     async def shutdown(self):
         """Closes all connections."""
@@ -30,102 +129,77 @@ class BatteryMessagingService:
             await self.nats_client.close()
         if self.db_pool:
             await self.db_pool.close()
-        print("Battery Messaging Service shut down.")
+        logger.info("Battery Messaging Service shut down.")
 
     async def create_installation(self, platform_nickname: str, callsign: str, 
                                   lat: float, lon: float, altitude_m: float = 0) -> Dict[str, Any]:
         """Creates a new battery installation in the database."""
         async with self.db_pool.acquire() as con:
-            platform_id = await con.fetchval("SELECT id FROM platform_type WHERE nickname = $1 AND category = 'counter_defense'", platform_nickname)
-            if not platform_id:
+            created = await con.fetchrow(SQL_CREATE_BATTERY, platform_nickname, callsign, lon, lat, altitude_m)
+            if not created['platform_id']:
                 raise ValueError(f"Platform '{platform_nickname}' is not a valid counter-defense platform.")
-
-            existing = await con.fetchval("SELECT id FROM installation WHERE callsign = $1", callsign)
-            if existing:
+            if not created['installation_id']:
                 raise ValueError(f"Installation with callsign '{callsign}' already exists.")
-
-            await con.execute("""
-                INSERT INTO installation (platform_type_id, callsign, geom, altitude_m)
-                VALUES ($1, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5)
-            """, platform_id, callsign, lon, lat, altitude_m)
             
             return {"status": "created", "callsign": callsign}
 
     async def arm_battery(self, battery_callsign: str, munition_nickname: str, quantity: int) -> Dict[str, Any]:
         """Arms a battery installation with a specific munition."""
         async with self.db_pool.acquire() as con:
-            battery_id = await con.fetchval("SELECT id FROM installation WHERE callsign = $1", battery_callsign)
-            if not battery_id:
+            armed = await con.fetchrow(SQL_ARM_BATTERY, battery_callsign, munition_nickname, quantity)
+            if not armed['battery_id']:
                 raise ValueError(f"Battery with callsign '{battery_callsign}' not found.")
-
-            munition_id = await con.fetchval("SELECT id FROM munition_type WHERE nickname = $1 AND category = 'defense'", munition_nickname)
-            if not munition_id:
+            if not armed['munition_id']:
                 raise ValueError(f"Munition '{munition_nickname}' is not a valid defense munition.")
-
-            await con.execute("""
-                INSERT INTO installation_munition (installation_id, munition_type_id, quantity)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (installation_id, munition_type_id)
-                DO UPDATE SET quantity = installation_munition.quantity + EXCLUDED.quantity;
-            """, battery_id, munition_id, quantity)
             
             return {"status": "armed", "battery_callsign": battery_callsign, "munition": munition_nickname, "quantity": quantity}
 
     async def launch_defense_missile(self, battery_callsign: str, munition_nickname: str, target_missile_id: str) -> Dict[str, Any]:
         """Validates and initiates a defense missile launch."""
         async with self.db_pool.acquire() as con:
-            async with con.transaction():
-                battery = await con.fetchrow("SELECT id, ST_X(geom::geometry) as lon, ST_Y(geom::geometry) as lat, altitude_m as alt FROM installation WHERE callsign = $1", battery_callsign)
-                if not battery:
-                    raise ValueError(f"Battery '{battery_callsign}' not found.")
-
-                munition_type = await con.fetchrow("SELECT id FROM munition_type WHERE nickname = $1 AND category = 'defense'", munition_nickname)
-                if not munition_type:
-                    raise ValueError(f"'{munition_nickname}' is not a valid defense munition.")
-
-                ammo_record = await con.fetchrow("SELECT id, quantity FROM installation_munition WHERE installation_id = $1 AND munition_type_id = $2", battery['id'], munition_type['id'])
-                if not ammo_record or ammo_record['quantity'] < 1:
-                    raise ValueError(f"Battery '{battery_callsign}' has no '{munition_nickname}' ammunition.")
-
-                await con.execute("UPDATE installation_munition SET quantity = quantity - 1 WHERE id = $1", ammo_record['id'])
-
-                fired_count = await con.fetchval("SELECT COUNT(*) FROM active_missile WHERE launch_installation_id = $1", battery['id'])
-                munition_abbreviation = "".join([c for c in munition_nickname if c.isupper() or c.isdigit()])
-                new_missile_callsign = f"{battery_callsign}-{munition_abbreviation}-{fired_count + 1}"
-
-                # The command center will calculate the intercept point. 
-                # For now, we assume a simplified targeting model where the target is the enemy missile.
-                # The simulation service will handle the actual intercept physics.
-                launch_message = {
-                    "type": "missile_launch",
-                    "missile_callsign": new_missile_callsign,
-                    "munition_nickname": munition_nickname,
-                    "launch_callsign": battery_callsign,
-                    "launch_lat": battery['lat'],
-                    "launch_lon": battery['lon'],
-                    "launch_alt": battery['alt'],
-                    "missile_type": "defense",
-                    "target_missile_id": target_missile_id, # Target for the interceptor
-                    "timestamp": time.time()
-                }
-                
-                await self.nats_client.publish("simulation.launch", json.dumps(launch_message).encode())
-                
-                return {"status": "launched", "interceptor_callsign": new_missile_callsign, "target": target_missile_id}
+            launch = await con.fetchrow(SQL_LAUNCH_INTERCEPTOR, battery_callsign, munition_nickname)
+            if launch['id'] is None:
+                raise ValueError(f"Battery '{battery_callsign}' not found.")
+            if launch['munition_id'] is None:
+                raise ValueError(f"'{munition_nickname}' is not a valid defense munition.")
+            if launch['remaining'] is None:
+                raise ValueError(f"Battery '{battery_callsign}' has no '{munition_nickname}' ammunition.")
+
+            new_missile_callsign = f"{battery_callsign}-{munition_abbreviation(munition_nickname)}-{launch['launch_number']}"
+
+            # The command center will calculate the intercept point. 
+            # For now, we assume a simplified targeting model where the target is the enemy missile.
+            # The simulation service will handle the actual intercept physics.
+            launch_message = {
+                "type": "missile_launch",
+                "missile_callsign": new_missile_callsign,
+                "munition_nickname": munition_nickname,
+                "launch_callsign": battery_callsign,
+                "launch_lat": launch['lat'],
+                "launch_lon": launch['lon'],
+                "launch_alt": launch['alt'],
+                "missile_type": "defense",
+                "target_missile_id": target_missile_id, # Target for the interceptor
+                "timestamp": time.time()
+            }
+            
+            await self.nats_client.publish("simulation.launch", orjson.dumps(launch_message))
+            
+            return {"status": "launched", "interceptor_callsign": new_missile_callsign, "target": target_missile_id}
 
     async def handle_engagement_order(self, msg):
         """Callback to process engagement orders from the command center."""
         try:
-            order = json.loads(msg.data.decode())
+            order = orjson.loads(msg.data)
             battery_callsign = order.get("battery_callsign")
             munition_nickname = order.get("munition_nickname", "SM-3") # Default interceptor
             target_missile_id = order.get("target_missile_id")
 
             if not all([battery_callsign, target_missile_id]):
-                print(f"Invalid engagement order received: {order}")
+                logger.warning("Invalid engagement order received: %s", order)
                 return
 
-            print(f"Received engagement order for battery {battery_callsign} to intercept {target_missile_id}")
+            logger.info("Received engagement order for battery %s to intercept %s", battery_callsign, target_missile_id)
             
             # Directly call launch logic. A more complex system might have a readiness check.
             await self.launch_defense_missile(
@@ -134,15 +208,15 @@ class BatteryMessagingService:
                 target_missile_id=target_missile_id
             )
 
-        except json.JSONDecodeError:
-            print(f"Failed to decode engagement order: {msg.data.decode()}")
+        except orjson.JSONDecodeError:
+            logger.warning("Failed to decode engagement order: %r", msg.data)
         except ValueError as e:
-            print(f"Failed to process engagement for {order.get('battery_callsign')}: {e}")
+            logger.warning("Failed to process engagement for %s: %s", order.get('battery_callsign'), e)
         except Exception as e:
-            print(f"An unexpected error occurred while handling engagement order: {e}")
+            logger.exception("An unexpected error occurred while handling engagement order: %s", e)
 
     async def listen_for_engagement_orders(self):
         """Subscribes to NATS subjects for engagement orders."""
         # Subscribes to a wildcard subject for all battery engagements
         await self.nats_client.subscribe("orders.engagement.>", cb=self.handle_engagement_order)
-        print("Listening for engagement orders on 'orders.engagement.>'") 
\ No newline at end of file
+        logger.info("Listening for engagement orders on 'orders.engagement.>'") 
\ No newline at end of file
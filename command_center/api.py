@@ -5,9 +5,8 @@ Handles REST API requests for command center operations
 from typing import Dict, List, Any
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
 
+from shared.metrics import add_metrics_route
 from messaging import CommandCenterMessagingService
 
 # Pydantic models
@@ -60,9 +59,7 @@ class CommandCenterAPI:
             """Health check endpoint"""
             return await self.messaging.health_check()
         
-        @self.app.get("/metrics")
-        def metrics():
-            return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        add_metrics_route(self.app)
     
     def get_app(self) -> FastAPI:
         """Get the FastAPI application"""
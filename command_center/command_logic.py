@@ -3,11 +3,12 @@ Command Logic for the Command Center Service
 Contains threat assessment and engagement coordination logic
 """
 import asyncio
+import itertools
 import json
 import math
 import time
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
 import asyncpg
@@ -24,7 +25,7 @@ BATTERY_SELECTIONS = Counter("battery_selections_total", "Total battery selectio
 INTERCEPT_PREDICTIONS = Counter("intercept_predictions_total", "Total intercept predictions calculated")
 COMMAND_DECISIONS = Histogram("command_decision_seconds", "Time spent on command decisions")
 
-@dataclass
+@dataclass(slots=True)
 class ThreatAssessment:
     missile_id: str
     missile_callsign: str
@@ -36,7 +37,7 @@ class ThreatAssessment:
     confidence: float
     detection_sources: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class BatteryCapability:
     battery_id: int
     callsign: str
@@ -48,8 +49,13 @@ class BatteryCapability:
     ammo_count: int
     status: str
     time_to_ready: float
+    # Range checks compare squared distances, so square the limit once
+    max_range_sq: float = field(init=False)
 
-@dataclass
+    def __post_init__(self):
+        self.max_range_sq = self.max_range * self.max_range
+
+@dataclass(slots=True, frozen=True)
 class InterceptSolution:
     battery_callsign: str
     intercept_point: Tuple[float, float, float]
@@ -67,6 +73,13 @@ class CommandLogic:
         
         self.active_threats: Dict[str, ThreatAssessment] = {}
         self.available_batteries: Dict[str, BatteryCapability] = {}
+        # Column arrays over available_batteries, one row per battery in
+        # battery_list order, for the vectorized engagement prefilter
+        self.battery_list: List[BatteryCapability] = []
+        self.battery_positions = np.empty((0, 3))
+        self.battery_max_range_sq = np.empty(0)
+        self.battery_max_altitude = np.empty(0)
+        self.battery_ready = np.empty(0, dtype=bool)
         self.engagement_attempts: Dict[str, List[Dict]] = {}  # missile_id -> attempts
         self.max_retries = 3
         
@@ -79,7 +92,7 @@ class CommandLogic:
         await self.nats_client.subscribe("radar.detection", cb=self.handle_radar_detection)
         
         # Subscribe to missile position updates
-        await self.nats_client.subscribe("missile.position", cb=self.handle_missile_position)
+        await self.nats_client.subscribe("missile.positions", cb=self.handle_missile_positions)
         
         # Subscribe to engagement results
         await self.nats_client.subscribe("engagement.result", cb=self.handle_engagement_result)
@@ -92,9 +105,13 @@ class CommandLogic:
     async def load_available_batteries(self):
         """Load available defense batteries from database"""
         async with self.db_pool.acquire() as conn:
+            # Ammo is held per munition in installation_munition; a battery
+            # counts as ready while any of its loadout remains
             rows = await conn.fetch("""
-                SELECT i.id, i.callsign, i.altitude_m, pt.max_range_m, pt.max_altitude_m, 
-                       pt.accuracy_percent, pt.reload_time_sec, i.ammo_count, i.status
+                SELECT i.id, i.callsign, i.lon_deg as lon, i.lat_deg as lat, i.altitude_m, pt.max_range_m, pt.max_altitude_m, 
+                       pt.accuracy_percent, pt.reload_time_sec, i.status,
+                       COALESCE((SELECT SUM(im.quantity) FROM installation_munition im
+                                 WHERE im.installation_id = i.id), 0)::int AS ammo_count
                 FROM installation i
                 JOIN platform_type pt ON i.platform_type_id = pt.id
                 WHERE pt.category = 'counter_defense' AND i.status = 'active'
@@ -103,21 +120,10 @@ class CommandLogic:
             print(f"DEBUG: Found {len(rows)} counter defense batteries in database")
             
             for row in rows:
-                # Parse geometry - convert WKB to WKT first
-                geom_wkt = await conn.fetchval(
-                    "SELECT ST_AsText(geom) FROM installation WHERE callsign = $1",
-                    row['callsign']
-                )
-                
-                # Parse WKT format: POINT(lon lat)
-                geom_parts = geom_wkt.replace('POINT(', '').replace(')', '').split(' ')
-                lon = float(geom_parts[0])
-                lat = float(geom_parts[1])
-                
                 battery = BatteryCapability(
                     battery_id=row['id'],
                     callsign=row['callsign'],
-                    position=(lat, lon, row['altitude_m']),
+                    position=(row['lat'], row['lon'], row['altitude_m']),
                     max_range=float(row['max_range_m']),
                     max_altitude=float(row['max_altitude_m']),
                     accuracy=float(row['accuracy_percent']) / 100.0,
@@ -129,6 +135,17 @@ class CommandLogic:
                 
                 self.available_batteries[row['callsign']] = battery
                 print(f"DEBUG: Loaded battery {battery.callsign} at {battery.position}, range: {battery.max_range}m, altitude: {battery.max_altitude}m, ammo: {battery.ammo_count}")
+        
+        self.rebuild_battery_arrays()
+    
+    def rebuild_battery_arrays(self):
+        """Refresh the battery column arrays after batteries or their status change"""
+        batteries = list(self.available_batteries.values())
+        self.battery_list = batteries
+        self.battery_positions = np.array([b.position for b in batteries], dtype=np.float64).reshape(-1, 3)
+        self.battery_max_range_sq = np.array([b.max_range_sq for b in batteries], dtype=np.float64)
+        self.battery_max_altitude = np.array([b.max_altitude for b in batteries], dtype=np.float64)
+        self.battery_ready = np.array([b.status == 'active' and b.ammo_count > 0 for b in batteries], dtype=bool)
     
     async def handle_radar_detection(self, msg):
         """Handle radar detection events"""
@@ -144,10 +161,14 @@ class CommandLogic:
         except Exception as e:
             print(f"Error handling radar detection: {e}")
     
-    async def handle_missile_position(self, msg):
-        """Handle missile position updates"""
+    async def handle_missile_positions(self, msg):
+        """Handle a batch of missile positions published once per tick"""
+        for data in json.loads(msg.data.decode())['missiles']:
+            await self.process_missile_position(data)
+    
+    async def process_missile_position(self, data: dict):
+        """Update the threat assessment for one missile position"""
         try:
-            data = json.loads(msg.data.decode())
             missile_id = data['id']
             position = data['position']
             velocity = data['velocity']
@@ -352,14 +373,17 @@ class CommandLogic:
         print(f"DEBUG: Looking for battery to intercept missile at position {threat.current_position}")
         print(f"DEBUG: Available batteries: {list(self.available_batteries.keys())}")
         
-        for battery_callsign, battery in self.available_batteries.items():
-            print(f"DEBUG: Checking battery {battery_callsign} - status: {battery.status}, ammo: {battery.ammo_count}")
-            
-            if battery.status != 'active' or battery.ammo_count <= 0:
-                print(f"DEBUG: Battery {battery_callsign} not available - status: {battery.status}, ammo: {battery.ammo_count}")
-                continue
-            
-            print(f"DEBUG: About to call calculate_intercept_solution for battery {battery_callsign}")
+        # Airborne threats only; below the surface nothing can engage
+        batteries = self.battery_list
+        if not batteries or threat.current_position[2] <= 0:
+            return None
+        
+        # Range, altitude and readiness are checked for all batteries at once;
+        # only the survivors get a full solution
+        engageable = self.filter_engageable(threat.current_position)
+        
+        for battery in itertools.compress(batteries, engageable):
+            battery_callsign = battery.callsign
             solution = self.calculate_intercept_solution(threat, battery)
             print(f"DEBUG: calculate_intercept_solution returned: {solution}")
             
@@ -370,11 +394,21 @@ class CommandLogic:
                 if score > best_score:
                     best_score = score
                     best_solution = solution
-            else:
-                print(f"DEBUG: Battery {battery_callsign} cannot intercept - distance or altitude issue")
         
         return best_solution
     
+    def filter_engageable(self, threat_pos: Tuple[float, float, float]) -> np.ndarray:
+        """Mask over battery_list of batteries that are ready and can reach threat_pos
+
+        Applies calculate_intercept_solution's range and altitude limits to
+        every battery in one pass, comparing squared distances.
+        """
+        offsets = self.battery_positions - np.asarray(threat_pos, dtype=np.float64)
+        distance_sq = np.einsum('ij,ij->i', offsets, offsets)
+        return (self.battery_ready
+                & (distance_sq <= self.battery_max_range_sq)
+                & (threat_pos[2] <= self.battery_max_altitude))
+    
     def calculate_intercept_solution(self, threat: ThreatAssessment, 
                                    battery: BatteryCapability) -> Optional[InterceptSolution]:
         """Calculate intercept solution for a battery"""
@@ -387,13 +421,12 @@ class CommandLogic:
             
             print(f"DEBUG: Battery {battery.callsign} at {battery_pos}, threat at {threat_pos}")
             
-            distance = math.sqrt(
+            distance_sq = (
                 (float(battery_pos[0]) - threat_pos[0])**2 + 
                 (float(battery_pos[1]) - threat_pos[1])**2 + 
                 (float(battery_pos[2]) - threat_pos[2])**2
             )
             
-            print(f"DEBUG: Distance: {distance}m, battery max_range: {battery.max_range}m")
             print(f"DEBUG: Threat altitude: {threat_pos[2]}m, battery max_altitude: {battery.max_altitude}m")
             
             # Only engage missiles that are airborne (above surface)
@@ -402,8 +435,8 @@ class CommandLogic:
                 return None
             
             # Check if battery can reach the threat
-            if distance > battery.max_range:
-                print(f"DEBUG: Distance {distance}m exceeds battery range {battery.max_range}m")
+            if distance_sq > battery.max_range_sq:
+                print(f"DEBUG: Distance exceeds battery range {battery.max_range}m")
                 return None
                 
             if threat_pos[2] > battery.max_altitude:
@@ -420,7 +453,8 @@ class CommandLogic:
             # Calculate intercept time
             intercept_time = threat.time_to_impact * 0.5  # Simplified
             
-            # Calculate probability of success
+            # Calculate probability of success; only reachable threats pay for the sqrt
+            distance = math.sqrt(distance_sq)
             probability = battery.accuracy * (1 - distance / battery.max_range)
             
             # Calculate time to launch
@@ -511,7 +545,9 @@ class CommandLogic:
         # Update ammo and status for already loaded batteries
         async with self.db_pool.acquire() as conn:
             batteries = await conn.fetch("""
-                SELECT i.callsign, i.ammo_count, i.status
+                SELECT i.callsign, i.status,
+                       COALESCE((SELECT SUM(im.quantity) FROM installation_munition im
+                                 WHERE im.installation_id = i.id), 0)::int AS ammo_count
                 FROM installation i
                 JOIN platform_type pt ON i.platform_type_id = pt.id
                 WHERE pt.category = 'counter_defense'
@@ -521,6 +557,7 @@ class CommandLogic:
                     battery = self.available_batteries[row['callsign']]
                     battery.ammo_count = row['ammo_count']
                     battery.status = row['status']
+        self.rebuild_battery_arrays()
     
     async def cleanup_old_threats(self):
         """Clean up old threats"""
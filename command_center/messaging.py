@@ -6,6 +6,8 @@ import time
 from typing import Dict, List, Any, Optional
 import asyncpg
 
+from shared.records import records_to_dicts
+
 class CommandCenterMessagingService:
     def __init__(self, db_pool: asyncpg.Pool):
         self.db_pool = db_pool
@@ -41,7 +43,7 @@ class CommandCenterMessagingService:
                 WHERE am.missile_type = 'attack' AND am.status = 'active'
                 ORDER BY am.launch_ts DESC
             """)
-            return [dict(t) for t in threats]
+            return records_to_dicts(threats)
     
     async def get_battery_status(self) -> List[Dict[str, Any]]:
         """Get status of all batteries"""
@@ -55,7 +57,7 @@ class CommandCenterMessagingService:
                 WHERE pt.category = 'counter_defense' AND i.status = 'active'
                 ORDER BY i.callsign
             """)
-            return [dict(b) for b in batteries]
+            return records_to_dicts(batteries)
     
     async def get_recent_engagements(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent engagement decisions"""
@@ -69,4 +71,4 @@ class CommandCenterMessagingService:
                 ORDER BY e.created_at DESC
                 LIMIT $1
             """, limit)
-            return [dict(e) for e in engagements] 
\ No newline at end of file
+            return records_to_dicts(engagements) 
\ No newline at end of file
@@ -41,9 +41,13 @@ CREATE TABLE installation (
     platform_type_id INT REFERENCES platform_type(id),
     callsign TEXT UNIQUE NOT NULL,
     geom GEOGRAPHY(Point,4326) NOT NULL,
+    -- Plain copies of geom's coordinates for reads that don't need PostGIS
+    lon_deg DOUBLE PRECISION GENERATED ALWAYS AS (ST_X(geom::geometry)) STORED,
+    lat_deg DOUBLE PRECISION GENERATED ALWAYS AS (ST_Y(geom::geometry)) STORED,
     altitude_m NUMERIC DEFAULT 0,
     heading_deg NUMERIC DEFAULT 0,
     status TEXT DEFAULT 'active' CHECK (status IN ('active', 'inactive', 'damaged', 'destroyed')),
+    launched_count INT NOT NULL DEFAULT 0, -- Numbers launched missile callsigns
     last_position_update TIMESTAMP DEFAULT NOW(),
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
@@ -81,6 +85,12 @@ CREATE TABLE active_missile (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Spatial indexes -------------------------------------------------------------
+-- Range filters must use ST_DWithin so these indexes apply; ST_Distance is for
+-- projecting a distance value, not for WHERE clauses.
+CREATE INDEX IF NOT EXISTS idx_installation_geom ON installation USING GIST (geom);
+CREATE INDEX IF NOT EXISTS idx_active_missile_geom ON active_missile USING GIST (current_geom);
+
 -- Scenario Actions -----------------------------------------------------------
 CREATE TABLE scenarios (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
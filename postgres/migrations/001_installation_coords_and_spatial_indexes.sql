@@ -0,0 +1,16 @@
+-- Brings databases created before these columns and indexes existed up to
+-- init.sql. Every statement is idempotent, so this is safe to run on every
+-- start and is a no-op on a volume created from the current init.sql.
+
+-- Plain copies of geom's coordinates for reads that don't need PostGIS
+ALTER TABLE installation
+    ADD COLUMN IF NOT EXISTS lon_deg DOUBLE PRECISION GENERATED ALWAYS AS (ST_X(geom::geometry)) STORED;
+ALTER TABLE installation
+    ADD COLUMN IF NOT EXISTS lat_deg DOUBLE PRECISION GENERATED ALWAYS AS (ST_Y(geom::geometry)) STORED;
+
+-- Numbers launched missile callsigns
+ALTER TABLE installation
+    ADD COLUMN IF NOT EXISTS launched_count INT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_installation_geom ON installation USING GIST (geom);
+CREATE INDEX IF NOT EXISTS idx_active_missile_geom ON active_missile USING GIST (current_geom);
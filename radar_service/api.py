@@ -3,10 +3,10 @@ API endpoints for the Radar Service
 Handles REST API requests for radar operations
 """
 from typing import Dict, List, Any
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
+from shared.metrics import add_metrics_route
 from messaging import RadarMessagingService
 
 # Pydantic models
@@ -67,9 +67,7 @@ class RadarServiceAPI:
             """Health check endpoint"""
             return await self.messaging.health_check()
         
-        @self.app.get("/metrics")
-        def metrics():
-            return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        add_metrics_route(self.app)
     
     def get_app(self) -> FastAPI:
         """Get the FastAPI application"""
@@ -6,6 +6,8 @@ import time
 from typing import Dict, List, Any, Optional
 import asyncpg
 
+from shared.records import records_to_dicts
+
 class RadarMessagingService:
     def __init__(self, db_pool: asyncpg.Pool):
         self.db_pool = db_pool
@@ -40,7 +42,7 @@ class RadarMessagingService:
                 WHERE pt.category = 'detection_system' AND i.status = 'active'
                 ORDER BY i.callsign
             """)
-            return [dict(i) for i in installations]
+            return records_to_dicts(installations)
     
     async def get_active_tracks(self) -> List[Dict[str, Any]]:
         """Get all active tracks"""
@@ -54,7 +56,7 @@ class RadarMessagingService:
                 WHERE am.missile_type = 'attack' AND am.status = 'active'
                 ORDER BY am.launch_ts DESC
             """)
-            return [dict(t) for t in tracks]
+            return records_to_dicts(tracks)
     
     async def get_recent_detections(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent detection events"""
@@ -70,7 +72,7 @@ class RadarMessagingService:
                 ORDER BY de.detection_ts DESC
                 LIMIT $1
             """, limit)
-            return [dict(d) for d in detections]
+            return records_to_dicts(detections)
     
     async def get_radar_statistics(self) -> Dict[str, Any]:
         """Get radar service statistics"""
@@ -77,7 +77,7 @@ class RadarLogic:
     async def initialize(self):
         """Initialize radar logic"""
         # Subscribe to missile position updates
-        await self.nats_client.subscribe("missile.position", cb=self.handle_missile_position)
+        await self.nats_client.subscribe("missile.positions", cb=self.handle_missile_positions)
         
         # Subscribe to detection events
         await self.nats_client.subscribe('detection.event', cb=self.handle_detection_event)
@@ -95,7 +95,7 @@ class RadarLogic:
         """Load all radar installations from database"""
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT i.id, i.callsign, i.geom, i.altitude_m, i.status,
+                SELECT i.id, i.callsign, i.lon_deg as lon, i.lat_deg as lat, i.altitude_m, i.status,
                        pt.detection_range_m, pt.sweep_rate_deg_per_sec, pt.max_altitude_m,
                        pt.accuracy_percent
                 FROM installation i
@@ -105,16 +105,8 @@ class RadarLogic:
             """)
             
             for row in rows:
-                # Parse geometry - convert WKB to WKT first
-                geom_wkt = await conn.fetchval(
-                    "SELECT ST_AsText(geom) FROM installation WHERE callsign = $1",
-                    row['callsign']
-                )
-                
-                # Parse WKT format: POINT(lon lat)
-                geom_parts = geom_wkt.replace('POINT(', '').replace(')', '').split(' ')
-                lon = float(geom_parts[0])
-                lat = float(geom_parts[1])
+                lat = row['lat']
+                lon = row['lon']
                 
                 # Create radar capability
                 capability = RadarCapability(
@@ -165,10 +157,14 @@ class RadarLogic:
         interval = int(base_interval * (base_sweep_rate / sweep_rate))
         return max(100, min(5000, interval))  # Clamp between 100ms and 5s
     
-    async def handle_missile_position(self, msg):
-        """Handle missile position updates from simulation service"""
+    async def handle_missile_positions(self, msg):
+        """Handle a batch of missile positions published once per tick"""
+        for data in json.loads(msg.data.decode())['missiles']:
+            await self.process_missile_position(data)
+    
+    async def process_missile_position(self, data: dict):
+        """Update the track for one missile position and check radars"""
         try:
-            data = json.loads(msg.data.decode())
             missile_id = data['id']
             missile_callsign = data['callsign']
             position = data['position']
@@ -235,12 +231,13 @@ class RadarLogic:
     def _check_single_radar(self, installation: RadarInstallation, missile_id: str, 
                            track: Track, timestamp: float) -> Optional[Dict]:
         """Check if a single radar installation detects the missile"""
-        # Calculate distance from radar to missile
-        distance = self._calculate_distance(installation.position, track.position)
-        
-        # Check if missile is within detection range
-        if distance > installation.capability.detection_range_m:
+        # Check if missile is within detection range; most radar/missile pairs
+        # are out of range, so compare squares and only take the root after
+        detection_range_m = installation.capability.detection_range_m
+        distance_sq = self._calculate_distance_squared(installation.position, track.position)
+        if distance_sq > detection_range_m * detection_range_m:
             return None
+        distance = math.sqrt(distance_sq)
         
         # Check if missile altitude is within radar capability
         if track.position['z'] > installation.capability.max_altitude_m:
@@ -281,15 +278,15 @@ class RadarLogic:
         
         return None
     
-    def _calculate_distance(self, radar_pos: Tuple[float, float, float], 
-                          missile_pos: Dict[str, float]) -> float:
-        """Calculate distance between radar and missile"""
+    def _calculate_distance_squared(self, radar_pos: Tuple[float, float, float], 
+                                    missile_pos: Dict[str, float]) -> float:
+        """Calculate squared distance between radar and missile"""
         # Convert lat/lon to approximate meters
         lat_diff = (radar_pos[0] - missile_pos['y']) * 111000  # meters per degree latitude
         lon_diff = (radar_pos[1] - missile_pos['x']) * 111000 * math.cos(math.radians(radar_pos[0]))
         alt_diff = radar_pos[2] - missile_pos['z']
         
-        return math.sqrt(lat_diff**2 + lon_diff**2 + alt_diff**2)
+        return lat_diff*lat_diff + lon_diff*lon_diff + alt_diff*alt_diff
     
     def _calculate_detection_probability(self, installation: RadarInstallation, 
                                        distance: float, missile_pos: Dict[str, float]) -> float:
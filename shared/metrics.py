@@ -0,0 +1,24 @@
+"""
+Prometheus /metrics endpoint shared by the service APIs
+"""
+import time
+from fastapi import FastAPI, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+# generate_latest() walks every metric family; scrapes inside this window
+# reuse the last rendered exposition
+METRICS_CACHE_TTL = 0.5
+
+def add_metrics_route(app: FastAPI, ttl: float = METRICS_CACHE_TTL):
+    """Serve the default registry on /metrics, re-rendering at most once per ttl"""
+    body = b""
+    expire = 0.0
+
+    @app.get("/metrics")
+    async def metrics():
+        nonlocal body, expire
+        now = time.monotonic()
+        if now >= expire:
+            body = generate_latest()
+            expire = now + ttl
+        return Response(body, media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,16 @@
+"""
+asyncpg result helpers shared by the service messaging layers
+"""
+from typing import Any, Dict, List
+import asyncpg
+
+def records_to_dicts(rows: List[asyncpg.Record]) -> List[Dict[str, Any]]:
+    """Convert fetched rows to dicts, resolving column names once per result
+
+    dict(record) looks every column up by name; zipping a shared key tuple
+    with the row values avoids that per row.
+    """
+    if not rows:
+        return []
+    keys = tuple(rows[0].keys())
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,40 @@
+"""
+Unit tests for the shared /metrics endpoint
+"""
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.metrics import add_metrics_route
+
+
+class TestMetricsRoute:
+    """Test cases for add_metrics_route"""
+    
+    def test_scrape_within_ttl_reuses_body(self):
+        """Test that a second scrape inside the TTL skips re-rendering"""
+        app = FastAPI()
+        add_metrics_route(app, ttl=60)
+        client = TestClient(app)
+        
+        with patch("shared.metrics.generate_latest", side_effect=[b"first\n", b"second\n"]) as render:
+            first = client.get("/metrics")
+            second = client.get("/metrics")
+        
+        assert first.status_code == 200
+        assert second.content == first.content == b"first\n"
+        assert first.headers["content-type"].startswith("text/plain")
+        render.assert_called_once_with()
+    
+    def test_scrape_after_ttl_renders_again(self):
+        """Test that an expired body is regenerated"""
+        app = FastAPI()
+        add_metrics_route(app, ttl=0)
+        client = TestClient(app)
+        
+        with patch("shared.metrics.generate_latest", side_effect=[b"first\n", b"second\n"]) as render:
+            client.get("/metrics")
+            response = client.get("/metrics")
+        
+        assert response.content == b"second\n"
+        assert render.call_count == 2
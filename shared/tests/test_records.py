@@ -0,0 +1,36 @@
+"""
+Unit tests for the shared asyncpg result helpers
+"""
+from shared.records import records_to_dicts
+
+
+class FakeRecord(tuple):
+    """Tuple with asyncpg.Record's keys(), enough for records_to_dicts"""
+    
+    def __new__(cls, fields):
+        record = super().__new__(cls, fields.values())
+        record._keys = tuple(fields)
+        return record
+    
+    def keys(self):
+        return iter(self._keys)
+
+
+class TestRecordsToDicts:
+    """Test cases for records_to_dicts"""
+    
+    def test_rows_become_dicts(self):
+        """Test that every row is keyed by the result's column names"""
+        rows = [
+            FakeRecord({"callsign": "RADAR-1", "status": "active"}),
+            FakeRecord({"callsign": "RADAR-2", "status": "inactive"})
+        ]
+        
+        assert records_to_dicts(rows) == [
+            {"callsign": "RADAR-1", "status": "active"},
+            {"callsign": "RADAR-2", "status": "inactive"}
+        ]
+    
+    def test_empty_result(self):
+        """Test that an empty result needs no first row"""
+        assert records_to_dicts([]) == []
@@ -5,9 +5,9 @@ Handles REST API requests for simulation management
 from typing import List
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
 
+from shared.metrics import add_metrics_route
 from messaging import SimulationMessagingService
 
 # Pydantic models
@@ -17,8 +17,6 @@ class InstallationCreate(BaseModel):
     lat: float
     lon: float
     altitude_m: float = 0
-    is_mobile: bool = False
-    ammo_count: int = 0
 
 class InstallationResponse(BaseModel):
     id: int
@@ -27,8 +25,6 @@ class InstallationResponse(BaseModel):
     lat: float
     lon: float
     altitude_m: float
-    is_mobile: bool
-    ammo_count: int
 
 class ScenarioSetup(BaseModel):
     scenario_name: str
@@ -37,7 +33,11 @@ class ScenarioSetup(BaseModel):
 class SimulationServiceAPI:
     def __init__(self, messaging_service: SimulationMessagingService):
         self.messaging = messaging_service
-        self.app = FastAPI(title="Missile Defense Simulation Service", version="1.0.0")
+        self.app = FastAPI(
+            title="Missile Defense Simulation Service",
+            version="1.0.0",
+            default_response_class=ORJSONResponse
+        )
         self._setup_routes()
     
     def _setup_routes(self):
@@ -51,7 +51,7 @@ class SimulationServiceAPI:
         @self.app.get("/installations")
         async def get_installations():
             """Get all installations"""
-            return await self.messaging.get_installations()
+            return Response(await self.messaging.get_installations(), media_type="application/json")
         
         @self.app.post("/installations", response_model=InstallationResponse)
         async def create_installation(installation: InstallationCreate):
@@ -62,9 +62,7 @@ class SimulationServiceAPI:
                     callsign=installation.callsign,
                     lat=installation.lat,
                     lon=installation.lon,
-                    altitude_m=installation.altitude_m,
-                    is_mobile=installation.is_mobile,
-                    ammo_count=installation.ammo_count
+                    altitude_m=installation.altitude_m
                 )
                 return InstallationResponse(**result)
             except ValueError as e:
@@ -102,7 +100,7 @@ class SimulationServiceAPI:
         @self.app.get("/platform-types")
         async def get_platform_types():
             """Get all available platform types"""
-            return await self.messaging.get_platform_types()
+            return Response(await self.messaging.get_platform_types(), media_type="application/json")
         
         @self.app.post("/cleanup")
         async def cleanup_simulation():
@@ -122,9 +120,7 @@ class SimulationServiceAPI:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Abort failed: {str(e)}")
         
-        @self.app.get("/metrics")
-        def metrics():
-            return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        add_metrics_route(self.app)
     
     def get_app(self) -> FastAPI:
         """Get the FastAPI application"""
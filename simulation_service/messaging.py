@@ -6,6 +6,64 @@ import time
 from typing import Dict, List, Any, Optional
 import asyncpg
 
+# Scenario installations are inserted in one statement, one array per column
+SQL_CREATE_INSTALLATIONS = """
+    INSERT INTO installation (platform_type_id, callsign, geom, altitude_m)
+    SELECT pt.id, r.callsign, ST_SetSRID(ST_MakePoint(r.lon, r.lat), 4326)::geography, r.altitude_m
+    FROM unnest($1::text[], $2::text[], $3::float8[], $4::float8[], $5::float8[])
+         WITH ORDINALITY AS r(platform_nickname, callsign, lon, lat, altitude_m, n)
+    JOIN platform_type pt ON pt.nickname = r.platform_nickname
+    ORDER BY r.n
+    ON CONFLICT (callsign) DO NOTHING
+    RETURNING id, callsign
+"""
+
+# Resolves the platform and inserts in one round trip. platform_id is NULL
+# for an unknown platform type and installation_id is NULL when the callsign
+# is already taken.
+SQL_CREATE_INSTALLATION = """
+    WITH pt AS (
+        SELECT id FROM platform_type WHERE nickname = $1
+    ),
+    ins AS (
+        INSERT INTO installation (platform_type_id, callsign, geom, altitude_m)
+        SELECT pt.id, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5 FROM pt
+        ON CONFLICT (callsign) DO NOTHING
+        RETURNING id
+    )
+    SELECT (SELECT id FROM pt) AS platform_id, (SELECT id FROM ins) AS installation_id
+"""
+
+SQL_UNKNOWN_PLATFORM_TYPES = """
+    SELECT DISTINCT r.nickname
+    FROM unnest($1::text[]) AS r(nickname)
+    WHERE NOT EXISTS (SELECT 1 FROM platform_type pt WHERE pt.nickname = r.nickname)
+"""
+
+# List reads are built into one JSON array by Postgres, so no per-row
+# Records or dicts are created. geom is cast to text, the same hex EWKB the
+# endpoint returned before.
+SQL_GET_INSTALLATIONS = """
+    SELECT COALESCE(json_agg(r ORDER BY r.category, r.callsign), '[]'::json)
+    FROM (
+        SELECT i.id, i.callsign, i.geom::text AS geom, i.altitude_m,
+               i.heading_deg, i.status,
+               pt.nickname as platform_type_nickname, pt.category
+        FROM installation i
+        JOIN platform_type pt ON i.platform_type_id = pt.id
+    ) r
+"""
+
+SQL_GET_PLATFORM_TYPES = """
+    SELECT COALESCE(json_agg(r ORDER BY r.category, r.nickname), '[]'::json)
+    FROM (
+        SELECT id, nickname, category, description, max_speed_mps,
+               max_range_m, max_altitude_m, blast_radius_m, detection_range_m,
+               sweep_rate_deg_per_sec, reload_time_sec, accuracy_percent
+        FROM platform_type
+    ) r
+"""
+
 class SimulationMessagingService:
     def __init__(self, db_pool: asyncpg.Pool):
         self.db_pool = db_pool
@@ -28,59 +86,31 @@ class SimulationMessagingService:
                 "timestamp": time.time()
             }
     
-    async def get_installations(self) -> List[Dict[str, Any]]:
-        """Get all installations"""
+    async def get_installations(self) -> str:
+        """Get all installations as a JSON array"""
         async with self.db_pool.acquire() as con:
-            installations = await con.fetch("""
-                SELECT i.id, i.callsign, i.geom, i.altitude_m, i.is_mobile, 
-                       i.current_speed_mps, i.heading_deg, i.status, i.ammo_count,
-                       pt.nickname as platform_type_nickname
-                FROM installation i
-                JOIN platform_type pt ON i.platform_type_id = pt.id
-                ORDER BY pt.category, i.callsign
-            """)
-            return [dict(i) for i in installations]
+            return await con.fetchval(SQL_GET_INSTALLATIONS)
     
     async def create_installation(self, platform_type_nickname: str, callsign: str,
-                                lat: float, lon: float, altitude_m: float = 0,
-                                is_mobile: bool = False, ammo_count: int = 0) -> Dict[str, Any]:
+                                lat: float, lon: float, altitude_m: float = 0) -> Dict[str, Any]:
         """Create a new installation"""
         async with self.db_pool.acquire() as con:
-            # Get platform type ID
-            platform_id = await con.fetchval(
-                "SELECT id FROM platform_type WHERE nickname = $1",
-                platform_type_nickname
+            created = await con.fetchrow(
+                SQL_CREATE_INSTALLATION, platform_type_nickname, callsign, lon, lat, altitude_m
             )
             
-            if not platform_id:
+            if not created["platform_id"]:
                 raise ValueError(f"Platform type {platform_type_nickname} not found")
-            
-            # Check if callsign already exists
-            existing = await con.fetchval(
-                "SELECT id FROM installation WHERE callsign = $1",
-                callsign
-            )
-            
-            if existing:
+            if not created["installation_id"]:
                 raise ValueError(f"Installation with callsign {callsign} already exists")
             
-            # Create installation
-            installation_id = await con.fetchval("""
-                INSERT INTO installation (
-                    platform_type_id, callsign, geom, altitude_m, is_mobile, ammo_count
-                ) VALUES ($1, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5, $6, $7)
-                RETURNING id
-            """, platform_id, callsign, lon, lat, altitude_m, is_mobile, ammo_count)
-            
             return {
-                "id": installation_id,
+                "id": created["installation_id"],
                 "platform_type_nickname": platform_type_nickname,
                 "callsign": callsign,
                 "lat": lat,
                 "lon": lon,
-                "altitude_m": altitude_m,
-                "is_mobile": is_mobile,
-                "ammo_count": ammo_count
+                "altitude_m": altitude_m
             }
     
     async def delete_installation(self, callsign: str) -> Dict[str, Any]:
@@ -108,69 +138,45 @@ class SimulationMessagingService:
     
     async def setup_scenario(self, scenario_name: str, installations: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Set up a complete scenario with installations"""
+        nicknames = [i["platform_type_nickname"] for i in installations]
         async with self.db_pool.acquire() as con:
             # Start transaction
             async with con.transaction():
-                created_installations = []
+                unknown = await con.fetch(SQL_UNKNOWN_PLATFORM_TYPES, nicknames)
+                if unknown:
+                    bad = next(i for i in installations if i["platform_type_nickname"] == unknown[0]["nickname"])
+                    raise ValueError(f"Failed to create installation {bad['callsign']}: Platform type {bad['platform_type_nickname']} not found")
                 
-                for installation_data in installations:
-                    try:
-                        # Get platform type ID
-                        platform_id = await con.fetchval(
-                            "SELECT id FROM platform_type WHERE nickname = $1",
-                            installation_data["platform_type_nickname"]
-                        )
-                        
-                        if not platform_id:
-                            raise ValueError(f"Platform type {installation_data['platform_type_nickname']} not found")
-                        
-                        # Check if callsign already exists
-                        existing = await con.fetchval(
-                            "SELECT id FROM installation WHERE callsign = $1",
-                            installation_data["callsign"]
-                        )
-                        
-                        if existing:
-                            # Skip if already exists
-                            continue
-                        
-                        # Create installation
-                        installation_id = await con.fetchval("""
-                            INSERT INTO installation (
-                                platform_type_id, callsign, geom, altitude_m, is_mobile, ammo_count
-                            ) VALUES ($1, $2, ST_SetSRID(ST_MakePoint($3, $4), 4326)::geography, $5, $6, $7)
-                            RETURNING id
-                        """, platform_id, installation_data["callsign"], 
-                             installation_data["lon"], installation_data["lat"],
-                             installation_data["altitude_m"], installation_data["is_mobile"],
-                             installation_data["ammo_count"])
-                        
-                        created_installations.append({
-                            "id": installation_id,
-                            "callsign": installation_data["callsign"],
-                            "platform_type": installation_data["platform_type_nickname"]
-                        })
-                        
-                    except Exception as e:
-                        raise ValueError(f"Failed to create installation {installation_data['callsign']}: {str(e)}")
-                
-                return {
-                    "scenario_name": scenario_name,
-                    "installations_created": len(created_installations),
-                    "installations": created_installations
-                }
+                # Existing callsigns are skipped by ON CONFLICT
+                rows = await con.fetch(
+                    SQL_CREATE_INSTALLATIONS,
+                    nicknames,
+                    [i["callsign"] for i in installations],
+                    [i["lon"] for i in installations],
+                    [i["lat"] for i in installations],
+                    [i["altitude_m"] for i in installations]
+                )
+                platform_by_callsign = {i["callsign"]: i["platform_type_nickname"] for i in installations}
+                created_installations = [
+                    {"id": r["id"], "callsign": r["callsign"], "platform_type": platform_by_callsign[r["callsign"]]}
+                    for r in rows
+                ]
+            
+            # Refresh planner statistics after the bulk load so ST_DWithin
+            # lookups use the GiST index instead of a sequential scan
+            if created_installations:
+                await con.execute("ANALYZE installation")
+            
+            return {
+                "scenario_name": scenario_name,
+                "installations_created": len(created_installations),
+                "installations": created_installations
+            }
     
-    async def get_platform_types(self) -> List[Dict[str, Any]]:
-        """Get all available platform types"""
+    async def get_platform_types(self) -> str:
+        """Get all available platform types as a JSON array"""
         async with self.db_pool.acquire() as con:
-            platform_types = await con.fetch("""
-                SELECT id, nickname, category, description, max_speed_mps, 
-                       max_range_m, max_altitude_m, blast_radius_m, detection_range_m,
-                       sweep_rate_deg_per_sec, reload_time_sec, accuracy_percent
-                FROM platform_type
-                ORDER BY category, nickname
-            """)
-            return [dict(p) for p in platform_types]
+            return await con.fetchval(SQL_GET_PLATFORM_TYPES)
     
     async def cleanup_simulation(self) -> Dict[str, Any]:
         """Clean up all simulation data - missiles, installations, etc."""
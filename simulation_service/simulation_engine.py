@@ -3,7 +3,6 @@ Simulation Engine for the Simulation Service
 Contains physics engine and core simulation logic
 """
 import asyncio
-import json
 import math
 import time
 import uuid
@@ -15,11 +14,29 @@ import asyncpg
 import nats
 from nats.aio.client import Client as NATS
 import zmq.asyncio
+import msgpack
+import orjson
 from prometheus_client import Counter, Gauge, Histogram
 import numpy as np
 from scipy.integrate import solve_ivp
 from scipy.spatial.distance import euclidean
 
+# NATS client buffer; large enough for a tick's missile.positions batch plus
+# the event messages published alongside it
+NATS_PENDING_SIZE = 16 * 1024 * 1024
+NATS_FLUSH_TIMEOUT = 0.05
+
+# Per-tick position write-back. asyncpg prepares it once per connection and
+# executemany pipelines one execution per missile over a single round trip.
+SQL_UPDATE_MISSILE_POSITION = """
+    UPDATE active_missile SET
+        current_geom = ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography,
+        current_altitude_m = $3,
+        velocity_x_mps = $4, velocity_y_mps = $5, velocity_z_mps = $6,
+        fuel_remaining_kg = $7, updated_at = NOW()
+    WHERE id = $8
+"""
+
 # Prometheus metrics
 MISSILE_UPDATES = Counter("missile_updates_total", "Total missile position updates")
 DETECTION_EVENTS = Counter("detection_events_total", "Total radar detection events")
@@ -53,11 +70,16 @@ class Vector3D:
     def magnitude(self) -> float:
         return math.sqrt(self.x**2 + self.y**2 + self.z**2)
     
+    def magnitude_squared(self) -> float:
+        """For comparing against a threshold without a sqrt"""
+        return self.x*self.x + self.y*self.y + self.z*self.z
+    
     def normalize(self) -> 'Vector3D':
         mag = self.magnitude()
         if mag == 0:
             return Vector3D(0, 0, 0)
-        return Vector3D(self.x/mag, self.y/mag, self.z/mag)
+        inv = 1.0 / mag
+        return Vector3D(self.x*inv, self.y*inv, self.z*inv)
     
     def __add__(self, other: 'Vector3D') -> 'Vector3D':
         return Vector3D(self.x + other.x, self.y + other.y, self.z + other.z)
@@ -257,6 +279,8 @@ class SimulationEngine:
         self.zmq_context = zmq_context
         self.zmq_pub = self.zmq_context.socket(zmq.PUB)
         self.zmq_sub = self.zmq_context.socket(zmq.SUB)
+        # One packer reused for every ZMQ frame
+        self.packer = msgpack.Packer(use_bin_type=True)
         
         self.physics_engine = PhysicsEngine()
         self.missiles: Dict[str, MissileState] = {}
@@ -266,7 +290,9 @@ class SimulationEngine:
         self.detected_missiles = {}  # {radar_callsign: set(missile_ids)}
         self.radar_detection_areas = {}  # {radar_callsign: detection_areas}
         
-        # Bind ZMQ sockets
+        # Bind ZMQ sockets; bound the send queue and discard it on close
+        self.zmq_pub.setsockopt(zmq.SNDHWM, 10000)
+        self.zmq_pub.setsockopt(zmq.LINGER, 0)
         self.zmq_pub.bind("tcp://0.0.0.0:5555")
         self.zmq_sub.connect("tcp://0.0.0.0:5555")
         self.zmq_sub.setsockopt_string(zmq.SUBSCRIBE, "")
@@ -292,7 +318,7 @@ class SimulationEngine:
         """Load all installations from database"""
         async with self.db_pool.acquire() as conn:
             installations = await conn.fetch("""
-                SELECT i.callsign, i.geom, i.altitude_m, i.status, i.ammo_count,
+                SELECT i.callsign, i.lon_deg as lon, i.lat_deg as lat, i.altitude_m, i.status,
                        pt.category, pt.detection_range_m, pt.max_range_m, pt.max_altitude_m
                 FROM installation i
                 JOIN platform_type pt ON i.platform_type_id = pt.id
@@ -300,25 +326,11 @@ class SimulationEngine:
             """)
             
             for row in installations:
-                # Parse geometry - convert WKB to WKT first
-                async with self.db_pool.acquire() as conn:
-                    geom_wkt = await conn.fetchval(
-                        "SELECT ST_AsText(geom) FROM installation WHERE callsign = $1",
-                        row['callsign']
-                    )
-                
-                # Parse WKT format: POINT(lon lat)
-                geom_parts = geom_wkt.replace('POINT(', '').replace(')', '').split(' ')
-                lon = float(geom_parts[0])
-                lat = float(geom_parts[1])
-                
                 self.installations[row['callsign']] = {
-                    'geom': geom_wkt,
-                    'lat': lat,
-                    'lon': lon,
+                    'lat': row['lat'],
+                    'lon': row['lon'],
                     'altitude_m': row['altitude_m'],
                     'status': row['status'],
-                    'ammo_count': row['ammo_count'],
                     'category': row['category'],
                     'detection_range_m': row['detection_range_m'],
                     'max_range_m': row['max_range_m'],
@@ -326,7 +338,7 @@ class SimulationEngine:
                 }
                 
                 # Update Prometheus metrics for installation positions
-                position_value = lat * 1000000 + (lon + 180) * 1000
+                position_value = row['lat'] * 1000000 + (row['lon'] + 180) * 1000
                 if row['category'] == 'detection_system':
                     RADAR_INSTALLATION_POSITION.labels(
                         callsign=row['callsign'],
@@ -382,8 +394,10 @@ class SimulationEngine:
             target_pos = Vector3D(float(target_lon), float(target_lat), float(target_alt))
             launch_pos = Vector3D(float(launch_lon), float(launch_lat), float(launch_alt))
             direction_to_target = target_pos - launch_pos
-            if direction_to_target.magnitude() > 0:
-                initial_velocity = direction_to_target.normalize() * initial_speed
+            distance = direction_to_target.magnitude()
+            if distance > 0:
+                # One division scales the direction straight to initial_speed
+                initial_velocity = direction_to_target * (initial_speed / distance)
             else:
                 initial_velocity = Vector3D(0, 0, initial_speed)
         
@@ -439,12 +453,15 @@ class SimulationEngine:
             missile.launch_time = time.time()
             print(f"DEBUG: Missile {missile.callsign} starting physics at position {missile.position}, velocity {missile.velocity}")
         
+        # One clock read per step; the checks below all use the same flight time
+        flight_time = time.time() - missile.launch_time
+        
         # Get current state
         state = [missile.position.x, missile.position.y, missile.position.z,
                 missile.velocity.x, missile.velocity.y, missile.velocity.z]
         
         # Calculate derivatives using physics engine
-        derivatives = self.physics_engine.missile_dynamics(time.time() - missile.launch_time, state, missile)
+        derivatives = self.physics_engine.missile_dynamics(flight_time, state, missile)
         
         # Update position and velocity using simple Euler integration
         missile.position.x += derivatives[0] * dt
@@ -458,7 +475,7 @@ class SimulationEngine:
         if missile.fuel_remaining > 0 and missile.status == "active":
             current_thrust_ratio = 1.0
             if missile.position.z < 0:
-                if time.time() - missile.launch_time < 3.0:
+                if flight_time < 3.0:
                     current_thrust_ratio = 0.5
                 else:
                     current_thrust_ratio = 0.9
@@ -472,8 +489,8 @@ class SimulationEngine:
             fuel_consumed = missile.fuel_consumption_rate * current_thrust_ratio * dt
             missile.fuel_remaining = max(0, missile.fuel_remaining - fuel_consumed)
         
-        if int(time.time() - missile.launch_time) % 10 == 0 and int(time.time() - missile.launch_time) > 0:
-            print(f"DEBUG: Missile {missile.callsign} at t={time.time() - missile.launch_time:.1f}s: pos={missile.position}, vel={missile.velocity}, fuel={missile.fuel_remaining:.1f}kg")
+        if int(flight_time) % 10 == 0 and int(flight_time) > 0:
+            print(f"DEBUG: Missile {missile.callsign} at t={flight_time:.1f}s: pos={missile.position}, vel={missile.velocity}, fuel={missile.fuel_remaining:.1f}kg")
         
         # Check for impact or fuel exhaustion
         if missile.fuel_remaining <= 0:
@@ -487,19 +504,16 @@ class SimulationEngine:
             # Missile hit water surface, but do not detonate, allow to continue
             pass
         elif missile.target_position and missile.position.z > 0:
-            distance_to_target = (missile.position - missile.target_position).magnitude()
             # Use the blast radius that was set from the database during missile creation
             blast_radius = missile.blast_radius
             if blast_radius <= 0:
                 print(f"WARNING: Missile {missile.callsign} has no blast radius set, using default 200m")
                 blast_radius = 200.0
                 
-            target_horizontal_distance = math.sqrt(
-                (missile.position.x - missile.target_position.x)**2 + 
-                (missile.position.y - missile.target_position.y)**2
-            )
+            dx = missile.position.x - missile.target_position.x
+            dy = missile.position.y - missile.target_position.y
             is_above_target = missile.position.z > missile.target_position.z
-            is_within_blast_radius = target_horizontal_distance <= blast_radius
+            is_within_blast_radius = dx*dx + dy*dy <= blast_radius*blast_radius
             is_descending = missile.velocity.z < 0
             if is_above_target and is_within_blast_radius and is_descending:
                 print(f"DEBUG: Missile {missile.callsign} detonating above target at position {missile.position} (blast radius: {blast_radius}m)")
@@ -524,11 +538,12 @@ class SimulationEngine:
             if target_missile.status != "active":
                 continue
             
-            # Calculate distance between defense missile and target
-            distance = (defense_missile.position - target_missile.position).magnitude()
+            # Calculate squared distance between defense missile and target
+            distance_sq = (defense_missile.position - target_missile.position).magnitude_squared()
             
             # Check if defense missile is within blast radius of target
-            if distance <= defense_missile.blast_radius:
+            if distance_sq <= defense_missile.blast_radius ** 2:
+                distance = math.sqrt(distance_sq)
                 print(f"Intercept: Defense missile {defense_missile.callsign} intercepted target {target_missile.callsign} at distance {distance:.1f}m")
                 
                 # Handle the intercept
@@ -605,7 +620,7 @@ class SimulationEngine:
             "timestamp": time.time()
         }
         
-        await self.nats_client.publish("missile.impact", json.dumps(impact_event).encode())
+        await self.nats_client.publish("missile.impact", orjson.dumps(impact_event, option=orjson.OPT_SERIALIZE_NUMPY))
     
     async def handle_intercept(self, defense_missile_id: str, target_missile_id: str):
         """Handle missile interception and record outcome"""
@@ -654,32 +669,38 @@ class SimulationEngine:
             "timestamp": time.time()
         }
         
-        await self.nats_client.publish("missile.intercepted", json.dumps(intercept_event).encode())
+        await self.nats_client.publish("missile.intercepted", orjson.dumps(intercept_event, option=orjson.OPT_SERIALIZE_NUMPY))
     
     async def check_detections(self):
         """Check for missile detections by radars and send events via NATS"""
+        now = time.time()
+        now_label = str(int(now))
+        active = [(missile_id, missile) for missile_id, missile in self.missiles.items()
+                  if missile.status == 'active']
+        if not active:
+            return
+        # Positions are gathered once so each radar's range test is a single
+        # array operation over all missiles rather than a Python loop
+        positions = np.array([(m.position.x, m.position.y, m.position.z) for _, m in active])
         for radar_callsign, radar in self.installations.items():
             if radar['category'] != 'detection_system':
                 continue
-            detection_range = float(radar['detection_range_m'])
-            radar_pos = Vector3D(float(radar['lon']), float(radar['lat']), float(radar['altitude_m']))
+            detection_range_sq = float(radar['detection_range_m']) ** 2
+            radar_pos = np.array([float(radar['lon']), float(radar['lat']), float(radar['altitude_m'])])
             detected_set = self.detected_missiles.setdefault(radar_callsign, set())
-            for missile_id, missile in self.missiles.items():
-                if missile.status != 'active':
-                    continue
-                # Calculate distance (simple Euclidean for now)
-                dx = missile.position.x - radar_pos.x
-                dy = missile.position.y - radar_pos.y
-                dz = missile.position.z - radar_pos.z
-                dist = math.sqrt(dx*dx + dy*dy + dz*dz)
-                if dist <= detection_range and missile_id not in detected_set:
+            # Calculate distance (simple Euclidean for now)
+            diff = positions - radar_pos
+            in_range = np.flatnonzero(np.einsum('ij,ij->i', diff, diff) <= detection_range_sq)
+            for i in in_range.tolist():
+                missile_id, missile = active[i]
+                if missile_id not in detected_set:
                     # New detection
                     detected_set.add(missile_id)
                     detection_event = {
                         'radar_callsign': radar_callsign,
                         'missile_id': missile_id,
                         'missile_position': {'x': missile.position.x, 'y': missile.position.y, 'z': missile.position.z},
-                        'timestamp': time.time(),
+                        'timestamp': now,
                         'signal_strength_db': 100,  # Placeholder
                         'confidence_percent': 95    # Placeholder
                     }
@@ -689,16 +710,21 @@ class SimulationEngine:
                     DETECTION_EVENT_POSITION.labels(
                         radar_callsign=radar_callsign,
                         missile_id=missile_id,
-                        timestamp=str(int(time.time()))
+                        timestamp=now_label
                     ).inc()
                     
-                    await self.nats_client.publish('detection.event', json.dumps(detection_event).encode())
+                    await self.nats_client.publish('detection.event', orjson.dumps(detection_event, option=orjson.OPT_SERIALIZE_NUMPY))
                     print(f"Detection: Radar {radar_callsign} detected missile {missile_id} at {missile.position}")
     
     async def broadcast_missile_positions(self):
         """Broadcast missile positions to all subscribers"""
         # Create a copy of missile IDs to avoid dictionary changed size during iteration
         missile_ids = list(self.missiles.keys())
+        # Frames for the whole tick go out as one missile.positions message
+        frames = []
+        updates = []
+        # Every frame in a tick carries the same timestamp
+        now = time.time()
         
         for missile_id in missile_ids:
             if missile_id not in self.missiles:
@@ -720,43 +746,40 @@ class SimulationEngine:
                 status=missile.status
             ).set(position_value)
             
-            # Update database
-            async with self.db_pool.acquire() as conn:
-                await conn.execute("""
-                    UPDATE active_missile SET
-                        current_geom = ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography,
-                        current_altitude_m = $3,
-                        velocity_x_mps = $4, velocity_y_mps = $5, velocity_z_mps = $6,
-                        fuel_remaining_kg = $7, updated_at = NOW()
-                    WHERE id = $8
-                """, missile.position.x, missile.position.y, missile.position.z,
-                     missile.velocity.x, missile.velocity.y, missile.velocity.z,
-                     missile.fuel_remaining, missile_id)
+            # Database rows are written together after the loop
+            updates.append((missile.position.x, missile.position.y, missile.position.z,
+                            missile.velocity.x, missile.velocity.y, missile.velocity.z,
+                            missile.fuel_remaining, missile_id))
             
-            # Broadcast via ZMQ
-            await self.zmq_pub.send_json({
+            frame = {
                 "id": missile_id,
                 "callsign": missile.callsign,
                 "position": {"x": missile.position.x, "y": missile.position.y, "z": missile.position.z},
                 "velocity": {"x": missile.velocity.x, "y": missile.velocity.y, "z": missile.velocity.z},
-                "timestamp": time.time(),
+                "timestamp": now,
                 "missile_type": missile.missile_type
-            })
+            }
             
-            # Also broadcast via NATS for radar service
-            await self.nats_client.publish(
-                "missile.position",
-                json.dumps({
-                    "id": missile_id,
-                    "callsign": missile.callsign,
-                    "position": {"x": missile.position.x, "y": missile.position.y, "z": missile.position.z},
-                    "velocity": {"x": missile.velocity.x, "y": missile.velocity.y, "z": missile.velocity.z},
-                    "timestamp": time.time(),
-                    "missile_type": missile.missile_type
-                }).encode()
-            )
+            # Broadcast via ZMQ as msgpack; the frame is handed over without a copy
+            await self.zmq_pub.send(self.packer.pack(frame), flags=zmq.NOBLOCK, copy=False)
             
+            frames.append(frame)
             MISSILE_UPDATES.inc()
+        
+        if updates:
+            async with self.db_pool.acquire() as conn:
+                await conn.executemany(SQL_UPDATE_MISSILE_POSITION, updates)
+        
+        # Also broadcast via NATS for the radar and command center services
+        if frames:
+            await self.nats_client.publish(
+                "missile.positions",
+                orjson.dumps({"timestamp": now, "missiles": frames}, option=orjson.OPT_SERIALIZE_NUMPY)
+            )
+            try:
+                await self.nats_client.flush(timeout=NATS_FLUSH_TIMEOUT)
+            except Exception as e:
+                print(f"Error flushing missile positions: {e}")
     
     async def run_simulation_loop(self):
         """Main simulation loop"""
@@ -792,7 +815,7 @@ class SimulationEngine:
         # Process ZMQ messages
         try:
             while await self.zmq_sub.poll(timeout=1):
-                message = await self.zmq_sub.recv_json()
+                message = msgpack.unpackb(await self.zmq_sub.recv(), raw=False)
                 await self.handle_message(message)
         except Exception as e:
             print(f"Error processing ZMQ message: {e}")
@@ -844,8 +867,7 @@ class SimulationEngine:
     async def handle_nats_message(self, msg):
         """Handle incoming NATS messages"""
         try:
-            import json
-            message = json.loads(msg.data.decode())
+            message = orjson.loads(msg.data)
             await self.handle_message(message)
         except Exception as e:
             print(f"Error handling NATS message: {e}")
@@ -853,7 +875,7 @@ class SimulationEngine:
     async def handle_radar_detection_areas(self, msg):
         """Handle radar detection area updates"""
         try:
-            data = json.loads(msg.data.decode())
+            data = orjson.loads(msg.data)
             radar_callsign = data['radar_callsign']
             detection_areas = data['detection_areas']
             
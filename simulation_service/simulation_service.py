@@ -14,7 +14,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from api import SimulationServiceAPI
 from messaging import SimulationMessagingService
-from simulation_engine import SimulationEngine
+from simulation_engine import SimulationEngine, NATS_PENDING_SIZE
 
 # Start Prometheus metrics server
 start_http_server(8001)
@@ -48,7 +48,7 @@ async def main():
     
     # Initialize NATS client
     nats_client = NATS()
-    await nats_client.connect(nats_url)
+    await nats_client.connect(nats_url, pending_size=NATS_PENDING_SIZE)
     print("Connected to NATS")
     
     # Initialize ZMQ context